@@ -0,0 +1,80 @@
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from processor import encode_texts
+
+# Where the offline step stores the per-category centroids.
+# float16 keeps the file tiny (25 categories x 384 dims is under 20 KB).
+CENTROIDS_PATH = "category_centroids.npz"
+
+
+def build_category_centroids(csv_file="UpdatedResumeDataSet.csv", output_path=CENTROIDS_PATH):
+    """
+    Offline step: embeds every labelled resume in the Kaggle dataset and
+    averages the vectors per Category to get one centroid per job family.
+    """
+    df = pd.read_csv(csv_file)
+
+    # The dataset contains many copy-pasted rows, drop them so they don't skew the means
+    df = df.dropna(subset=['Category', 'Resume']).drop_duplicates(subset=['Resume'])
+
+    embeddings = encode_texts(df['Resume'].astype(str).tolist())
+    labels = df['Category'].to_numpy()
+
+    categories = sorted(df['Category'].unique())
+    centroids = np.vstack([embeddings[labels == category].mean(axis=0) for category in categories])
+
+    # Re-normalize so routing is a plain dot product
+    centroids = centroids / np.linalg.norm(centroids, axis=1, keepdims=True)
+
+    np.savez_compressed(output_path, categories=np.array(categories), centroids=centroids.astype(np.float16))
+    return categories
+
+
+def load_category_centroids(path=CENTROIDS_PATH):
+    """
+    Loads the saved centroids once per process.
+    Returns (categories, centroids) or None if the offline step hasn't been run yet.
+    """
+    # The missing-file case isn't cached, so routing switches on as soon as the offline step has run
+    if not os.path.exists(path):
+        return None
+    return _read_centroids(path)
+
+
+@lru_cache(maxsize=4)
+def _read_centroids(path):
+    with np.load(path) as data:
+        categories = [str(category) for category in data['categories']]
+        centroids = data['centroids'].astype(np.float32)
+    return categories, centroids
+
+
+def assign_categories(embeddings, categories, centroids):
+    """
+    Routes each (normalized) embedding to its closest category centroid.
+    The whole batch is a single (N x D) @ (D x C) matrix product.
+    """
+    similarities = np.asarray(embeddings, dtype=np.float32) @ centroids.T
+    return [categories[idx] for idx in similarities.argmax(axis=1)]
+
+
+def categorize_embeddings(embeddings, path=CENTROIDS_PATH):
+    """
+    Routes already-computed embeddings (e.g. the cached JD vector) without encoding anything.
+    Returns None if no centroids are available.
+    """
+    router = load_category_centroids(path)
+    if router is None or len(embeddings) == 0:
+        return None
+
+    categories, centroids = router
+    return assign_categories(embeddings, categories, centroids)
+
+
+if __name__ == "__main__":
+    built = build_category_centroids()
+    print(f"Saved {len(built)} category centroids to '{CENTROIDS_PATH}'.")
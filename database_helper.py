@@ -1,53 +1,110 @@
-import mysql.connector
+import base64
+
+from search_index import index_resumes
+from storage_backends import get_backend
+from text_utils import content_hash
+from near_duplicates import LSHIndex, minhash_signature, pack_signature, unpack_signature
 
 
 def get_db_connection():
     """
-    Establish and return a MySQL database connection.
+    Establish and return a connection to the configured storage backend
+    (MySQL by default, or embedded SQLite with RESUME_DB_BACKEND=sqlite).
     Returns None if the connection fails.
     """
     try:
-        conn = mysql.connector.connect(
-            host="localhost",
-            user="root",
-            password="12345",
-            database="resume_analyzer_db"
-        )
-        return conn
-    except mysql.connector.Error as err:
+        return get_backend().connect()
+    except Exception as err:
         print(f"Database Connection Error: {err}")
         return None
 
 
-def save_analysis_to_db(user_id, resume_name, jd_text, score, gaps):
+def _upsert_job_description(cursor, title, jd_text, created_by):
     """
-    Save a single resume analysis result.
-    Inserts the JD, Resume, and links them in the analysis_results table.
+    Store a JD once per author and normalized content hash, and return its id.
+    Re-analysing against the same posting reuses the author's existing row instead of writing the text again.
     """
-    db = get_db_connection()
-    if not db: return False
+    return get_backend().insert_or_get_id(cursor, "job_descriptions", {
+        "job_title": title,
+        "jd_content": jd_text,
+        "created_by": created_by,
+        "content_hash": content_hash(jd_text)
+    }, key_columns=("created_by", "content_hash"))
+
+
+def _write_signature(cursor, res_id, text, signature=None):
+    """
+    Store the resume's MinHash signature so later uploads can be checked for near-duplicates.
+    Uses the precomputed signature if given, otherwise computes it from the text.
+    Returns the signature, or None if there was nothing to store (no text, or text without any words).
+    """
+    if signature is None and text:
+        signature = minhash_signature(text)
+    if signature is None:
+        return None
+
+    cursor.execute("INSERT INTO resume_signatures (resume_id, signature) VALUES (%s, %s)",
+                   (res_id, pack_signature(signature)))
+    return signature
 
+
+def _index_stored_resumes(owner_id, stored):
+    """
+    Add freshly saved resumes to the BM25 search index and the near-duplicate index.
+    'stored' is a list of (resume_id, file_name, text, signature, vector) tuples; blank text and missing
+    signatures are skipped.
+    An indexing failure never undoes the database write.
+    """
     try:
-        cursor = db.cursor()
+        for res_id, _, _, signature, _ in stored:
+            if signature is not None and _signature_index is not None:
+                _signature_index.add(res_id, signature, owner_id)
+        # The vectors were computed while scoring; only resumes saved without one get encoded here
+        index_resumes([(res_id, text, file_name, owner_id, vector)
+                       for res_id, file_name, text, _, vector in stored if text and text.strip()])
+    except Exception as e:
+        print(f"Indexing Error: {e}")
 
-        # Insert the job description
-        cursor.execute("INSERT INTO job_descriptions (job_title, jd_content, created_by) VALUES (%s, %s, %s)",
-                       ("Analysis Target", jd_text, user_id))
-        jd_id = cursor.lastrowid
 
-        # Insert the resume metadata
-        cursor.execute("INSERT INTO resumes (user_id, file_name) VALUES (%s, %s)", (user_id, resume_name))
-        res_id = cursor.lastrowid
+def _write_analysis(cursor, user_id, resume_name, jd_text, score, gaps, resume_text=None, resume_vector=None):
+    """
+    Insert one analysis using an open cursor (the caller commits).
+    Returns the (resume_id, file_name, text, signature, vector) tuples to index once committed.
+    """
+    # Insert the job description (or reuse it if this exact JD was stored before)
+    jd_id = _upsert_job_description(cursor, "Analysis Target", jd_text, user_id)
 
-        # Convert gaps list to a comma-separated string if needed
-        gaps_str = ", ".join(gaps) if isinstance(gaps, list) else gaps
+    # Insert the resume metadata
+    cursor.execute("INSERT INTO resumes (user_id, file_name) VALUES (%s, %s)", (user_id, resume_name))
+    res_id = cursor.lastrowid
 
-        # Save the final score and link the JD and Resume IDs
-        cursor.execute(
-            "INSERT INTO analysis_results (resume_id, jd_id, user_id, match_score, skill_gap_analysis) VALUES (%s, %s, %s, %s, %s)",
-            (res_id, jd_id, user_id, score, gaps_str))
+    # Convert gaps list to a comma-separated string if needed
+    gaps_str = ", ".join(gaps) if isinstance(gaps, list) else gaps
+
+    # Save the final score and link the JD and Resume IDs
+    cursor.execute(
+        "INSERT INTO analysis_results (resume_id, jd_id, user_id, match_score, skill_gap_analysis) VALUES (%s, %s, %s, %s, %s)",
+        (res_id, jd_id, user_id, score, gaps_str))
+
+    signature = _write_signature(cursor, res_id, resume_text)
+    return [(res_id, resume_name, resume_text, signature, resume_vector)]
+
+
+def save_analysis_to_db(user_id, resume_name, jd_text, score, gaps, resume_text=None, resume_vector=None):
+    """
+    Save a single resume analysis result.
+    Inserts the JD, Resume, and links them in the analysis_results table.
+    If resume_text is given, the resume is also added to the search index (with resume_vector, its SBERT
+    embedding from scoring, if there is one).
+    """
+    db = get_db_connection()
+    if not db: return False
 
+    try:
+        cursor = db.cursor()
+        stored = _write_analysis(cursor, user_id, resume_name, jd_text, score, gaps, resume_text, resume_vector)
         db.commit()
+        _index_stored_resumes(user_id, stored)
         return True
     except Exception as e:
         print(f"Storage Error: {e}")
@@ -56,93 +113,231 @@ def save_analysis_to_db(user_id, resume_name, jd_text, score, gaps):
         db.close()
 
 
-def fetch_user_history(user_id):
+# --- KEYSET PAGINATION HELPERS ---
+# Pages are fetched with "WHERE id < last_seen_id ORDER BY id DESC", which walks the
+# (owner, id) index directly, so page N costs the same as page 1 (no OFFSET scan).
+
+PAGE_SIZE = 10
+
+
+def encode_cursor(last_id):
+    """Turn the last row id of a page into an opaque cursor token."""
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode()
+
+
+def decode_cursor(token):
+    """Turn a cursor token back into a row id. Returns None for a missing or malformed token."""
+    if not token:
+        return None
+    try:
+        return int(base64.urlsafe_b64decode(token.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def _fetch_page(base_query, owner_id, id_column, cursor_token, page_size):
     """
-    Get the 10 most recent resume analyses for a specific job seeker.
+    Run a keyset-paginated query for one page.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
     """
     db = get_db_connection()
-    if not db: return []
+    if not db: return [], None
 
     try:
         cursor = db.cursor(dictionary=True)
-        # Join analysis results with resumes to get filenames and scores
-        query = """
-            SELECT r.file_name, a.match_score, a.skill_gap_analysis 
-            FROM analysis_results a 
-            JOIN resumes r ON a.resume_id = r.id 
-            WHERE a.user_id = %s 
-            ORDER BY a.id DESC LIMIT 10
-        """
-        cursor.execute(query, (user_id,))
-        return cursor.fetchall()
+        params = [owner_id]
+        last_id = decode_cursor(cursor_token)
+        if last_id is not None:
+            base_query += f" AND {id_column} < %s"
+            params.append(last_id)
+
+        # Fetch one extra row to know whether another page exists
+        cursor.execute(f"{base_query} ORDER BY {id_column} DESC LIMIT %s", (*params, page_size + 1))
+        rows = cursor.fetchall()
+
+        next_cursor = encode_cursor(rows[page_size - 1]['id']) if len(rows) > page_size else None
+        return rows[:page_size], next_cursor
     finally:
         db.close()
 
 
+def fetch_user_history_page(user_id, cursor=None, page_size=PAGE_SIZE):
+    """
+    Get one page of a job seeker's resume analyses, newest first.
+    Pass the returned cursor back in to get the next (older) page.
+    """
+    # Join analysis results with resumes to get filenames and scores
+    query = """
+        SELECT a.id, r.file_name, a.match_score, a.skill_gap_analysis 
+        FROM analysis_results a 
+        JOIN resumes r ON a.resume_id = r.id 
+        WHERE a.user_id = %s
+    """
+    return _fetch_page(query, user_id, "a.id", cursor, page_size)
+
+
+def fetch_user_history(user_id):
+    """
+    Get the 10 most recent resume analyses for a specific job seeker.
+    """
+    rows, _ = fetch_user_history_page(user_id)
+    return rows
+
+
 # --- RECRUITER FUNCTIONS ---
 
+def _write_shortlist(cursor, recruiter_id, jd_text, title, candidates_list):
+    """
+    Insert a shortlist and its ranked candidates using an open cursor (the caller commits).
+    Returns the (resume_id, file_name, text, signature, vector) tuples to index once committed.
+    """
+    # Create the JD entry (or reuse the existing one for identical JD text)
+    jd_id = _upsert_job_description(cursor, title, jd_text, recruiter_id)
+
+    # Create the shortlist header
+    cursor.execute("INSERT INTO shortlists (recruiter_id, jd_id, title) VALUES (%s, %s, %s)",
+                   (recruiter_id, jd_id, title))
+    shortlist_id = cursor.lastrowid
+    stored = []
+
+    # Loop through the ranked candidates and save them
+    for rank, cand in enumerate(candidates_list, start=1):
+        # Insert candidate resume
+        cursor.execute("INSERT INTO resumes (user_id, file_name) VALUES (%s, %s)",
+                       (recruiter_id, cand['Candidate']))
+        res_id = cursor.lastrowid
+
+        # Save the match score for this candidate
+        cursor.execute(
+            "INSERT INTO analysis_results (resume_id, jd_id, user_id, match_score) VALUES (%s, %s, %s, %s)",
+            (res_id, jd_id, recruiter_id, cand['Score']))
+        analysis_id = cursor.lastrowid
+
+        # Link the candidate to the shortlist with their specific rank
+        cursor.execute(
+            "INSERT INTO shortlist_items (shortlist_id, resume_id, analysis_result_id, rank_order) VALUES (%s, %s, %s, %s)",
+            (shortlist_id, res_id, analysis_id, rank))
+        signature = _write_signature(cursor, res_id, cand.get('Text'), cand.get('Signature'))
+        stored.append((res_id, cand['Candidate'], cand.get('Text'), signature, cand.get('Vector')))
+
+    return stored
+
+
 def save_full_shortlist(recruiter_id, jd_text, title, candidates_list):
     """
     Save a batch of ranked candidates as a shortlist for recruiters.
+    Candidates carrying a 'Text' key are also added to the search index (the text itself is not stored in MySQL),
+    reusing their 'Vector' (SBERT embedding) if present, and a 'Signature' key (MinHash) is stored
+    for near-duplicate detection.
     """
     db = get_db_connection()
     if not db: return False
 
     try:
         cursor = db.cursor()
+        stored = _write_shortlist(cursor, recruiter_id, jd_text, title, candidates_list)
+        db.commit()
+        _index_stored_resumes(recruiter_id, stored)
+        return True
+    finally:
+        db.close()
+
+
+# --- BATCHED WRITES (used by the write-behind queue) ---
 
-        # Create the JD entry
-        cursor.execute("INSERT INTO job_descriptions (job_title, jd_content, created_by) VALUES (%s, %s, %s)",
-                       (title, jd_text, recruiter_id))
-        jd_id = cursor.lastrowid
-
-        # Create the shortlist header
-        cursor.execute("INSERT INTO shortlists (recruiter_id, jd_id, title) VALUES (%s, %s, %s)",
-                       (recruiter_id, jd_id, title))
-        shortlist_id = cursor.lastrowid
-
-        # Loop through the ranked candidates and save them
-        for rank, cand in enumerate(candidates_list, start=1):
-            # Insert candidate resume
-            cursor.execute("INSERT INTO resumes (user_id, file_name) VALUES (%s, %s)",
-                           (recruiter_id, cand['Candidate']))
-            res_id = cursor.lastrowid
-
-            # Save the match score for this candidate
-            cursor.execute(
-                "INSERT INTO analysis_results (resume_id, jd_id, user_id, match_score) VALUES (%s, %s, %s, %s)",
-                (res_id, jd_id, recruiter_id, cand['Score']))
-            analysis_id = cursor.lastrowid
-
-            # Link the candidate to the shortlist with their specific rank
-            cursor.execute(
-                "INSERT INTO shortlist_items (shortlist_id, resume_id, analysis_result_id, rank_order) VALUES (%s, %s, %s, %s)",
-                (shortlist_id, res_id, analysis_id, rank))
+# Maps a job 'kind' to (cursor-level writer, payload key holding the owner id)
+_BATCH_WRITERS = {
+    "analysis": (_write_analysis, "user_id"),
+    "shortlist": (_write_shortlist, "recruiter_id"),
+}
+
+
+def save_write_batch(jobs):
+    """
+    Write several queued jobs in a single transaction.
+    Each job is a dict with a 'kind' ("analysis" or "shortlist") and a 'payload' holding the keyword
+    arguments of save_analysis_to_db / save_full_shortlist. Returns True only if all of them committed.
+    """
+    db = get_db_connection()
+    if not db: return False
 
+    try:
+        cursor = db.cursor()
+        to_index = []
+        for job in jobs:
+            writer, owner_key = _BATCH_WRITERS[job['kind']]
+            to_index.append((job['payload'][owner_key], writer(cursor, **job['payload'])))
         db.commit()
-        return True
+    except Exception as e:
+        db.rollback()
+        print(f"Storage Error: {e}")
+        return False
     finally:
         db.close()
 
+    for owner_id, stored in to_index:
+        _index_stored_resumes(owner_id, stored)
+    return True
+
+
+def fetch_recruiter_shortlists_page(recruiter_id, cursor=None, page_size=PAGE_SIZE):
+    """
+    Get one page of a recruiter's saved shortlists, newest first.
+    Pass the returned cursor back in to get the next (older) page.
+    """
+    # The job title shown is the one this shortlist was saved under. The JD row is shared by every
+    # shortlist against the same posting, so its job_title only remembers the first one.
+    query = """
+        SELECT s.id, s.title, s.title AS job_title, s.created_at 
+        FROM shortlists s 
+        WHERE s.recruiter_id = %s
+    """
+    return _fetch_page(query, recruiter_id, "s.id", cursor, page_size)
+
 
 def fetch_recruiter_shortlists(recruiter_id):
     """
-    Get all saved shortlists to display on the recruiter dashboard.
+    Get the newest page of saved shortlists to display on the recruiter dashboard.
+    """
+    rows, _ = fetch_recruiter_shortlists_page(recruiter_id)
+    return rows
+
+
+# --- NEAR-DUPLICATE LOOKUPS ---
+
+_signature_index = None
+
+
+def fetch_resume_signatures():
+    """
+    Get every stored MinHash signature with its owner (the user who uploaded the resume)
+    as {resume_id: (owner_id, signature)}.
     """
     db = get_db_connection()
-    if not db: return []
+    if not db: return {}
 
     try:
-        cursor = db.cursor(dictionary=True)
-        # Fetch shortlist details along with the targeted job title
-        query = """
-            SELECT s.id, s.title, j.job_title, s.created_at 
-            FROM shortlists s 
-            JOIN job_descriptions j ON s.jd_id = j.id 
-            WHERE s.recruiter_id = %s 
-            ORDER BY s.id DESC
-        """
-        cursor.execute(query, (recruiter_id,))
-        return cursor.fetchall()
+        cursor = db.cursor()
+        cursor.execute("""
+            SELECT s.resume_id, r.user_id, s.signature
+            FROM resume_signatures s
+            JOIN resumes r ON s.resume_id = r.id
+        """)
+        return {res_id: (owner_id, unpack_signature(data)) for res_id, owner_id, data in cursor.fetchall()}
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_signature_index():
+    """
+    LSH index over all stored resume signatures, loaded once per process
+    and kept up to date as new resumes are saved.
+    Query it with owner_id so users only ever match their own stored resumes.
+    """
+    global _signature_index
+    if _signature_index is None:
+        index = LSHIndex()
+        for res_id, (owner_id, signature) in fetch_resume_signatures().items():
+            index.add(res_id, signature, owner_id)
+        _signature_index = index
+    return _signature_index
@@ -0,0 +1,149 @@
+# Versioned schema for the resume analyzer database.
+# Each migration is applied once, in order, and recorded in the schema_version table.
+# Table DDL uses {pk} / {text} placeholders that each storage backend fills in for its SQL dialect.
+
+SCHEMA_VERSION = 4
+
+MIGRATIONS = {
+    1: {
+        "tables": [
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                id {pk},
+                full_name VARCHAR(255) NOT NULL,
+                email VARCHAR(255) NOT NULL UNIQUE,
+                password_hash VARCHAR(64) NOT NULL,
+                user_role VARCHAR(32) NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS job_descriptions (
+                id {pk},
+                job_title VARCHAR(255),
+                jd_content {text} NOT NULL,
+                created_by INT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (created_by) REFERENCES users(id)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS resumes (
+                id {pk},
+                user_id INT,
+                file_name VARCHAR(255) NOT NULL,
+                uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(id)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS analysis_results (
+                id {pk},
+                resume_id INT NOT NULL,
+                jd_id INT NOT NULL,
+                user_id INT,
+                match_score FLOAT,
+                skill_gap_analysis {text},
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (resume_id) REFERENCES resumes(id),
+                FOREIGN KEY (jd_id) REFERENCES job_descriptions(id)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS shortlists (
+                id {pk},
+                recruiter_id INT NOT NULL,
+                jd_id INT NOT NULL,
+                title VARCHAR(255),
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (recruiter_id) REFERENCES users(id),
+                FOREIGN KEY (jd_id) REFERENCES job_descriptions(id)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS shortlist_items (
+                id {pk},
+                shortlist_id INT NOT NULL,
+                resume_id INT NOT NULL,
+                analysis_result_id INT NOT NULL,
+                rank_order INT NOT NULL,
+                FOREIGN KEY (shortlist_id) REFERENCES shortlists(id),
+                FOREIGN KEY (resume_id) REFERENCES resumes(id),
+                FOREIGN KEY (analysis_result_id) REFERENCES analysis_results(id)
+            )
+            """,
+        ],
+        # (index name, table, columns)
+        "indexes": [
+            ("idx_analysis_user", "analysis_results", ("user_id", "id")),
+            ("idx_shortlists_recruiter", "shortlists", ("recruiter_id", "id")),
+            ("idx_shortlist_items_rank", "shortlist_items", ("shortlist_id", "rank_order")),
+            ("idx_resumes_user", "resumes", ("user_id",)),
+        ],
+    },
+    2: {
+        # JDs are stored once per normalized content hash (see text_utils.content_hash).
+        # Rows written before this migration keep a NULL hash, which the unique index allows.
+        "statements": [
+            "ALTER TABLE job_descriptions ADD COLUMN content_hash CHAR(64)",
+        ],
+        "unique_indexes": [
+            ("uq_job_descriptions_hash", "job_descriptions", ("content_hash",)),
+        ],
+    },
+    3: {
+        # Packed MinHash signatures (see near_duplicates.pack_signature) for near-duplicate lookups
+        "tables": [
+            """
+            CREATE TABLE IF NOT EXISTS resume_signatures (
+                resume_id INT PRIMARY KEY,
+                signature BLOB NOT NULL,
+                FOREIGN KEY (resume_id) REFERENCES resumes(id)
+            )
+            """,
+        ],
+    },
+    4: {
+        # JD dedupe is per author: a posting is stored once per (created_by, content_hash),
+        # so one user's shortlists never pick up another user's job title.
+        "drop_indexes": [
+            ("uq_job_descriptions_hash", "job_descriptions"),
+        ],
+        "unique_indexes": [
+            ("uq_job_descriptions_owner_hash", "job_descriptions", ("created_by", "content_hash")),
+        ],
+    },
+}
+
+
+def ensure_schema(conn, backend):
+    """
+    Brings the database up to SCHEMA_VERSION.
+    Safe to call on every startup: already-applied migrations are skipped.
+    """
+    cursor = conn.cursor()
+    cursor.execute("CREATE TABLE IF NOT EXISTS schema_version (version INT NOT NULL)")
+    cursor.execute("SELECT MAX(version) FROM schema_version")
+    row = cursor.fetchone()
+    current = row[0] if row and row[0] is not None else 0
+
+    for version in sorted(MIGRATIONS):
+        if version <= current:
+            continue
+
+        migration = MIGRATIONS[version]
+        for statement in migration.get("tables", []):
+            cursor.execute(backend.render_ddl(statement))
+        for statement in migration.get("statements", []):
+            cursor.execute(backend.render_ddl(statement))
+        for name, table in migration.get("drop_indexes", []):
+            backend.drop_index(cursor, name, table)
+        for name, table, columns in migration.get("indexes", []):
+            backend.create_index(cursor, name, table, columns)
+        for name, table, columns in migration.get("unique_indexes", []):
+            backend.create_index(cursor, name, table, columns, unique=True)
+
+        cursor.execute("INSERT INTO schema_version (version) VALUES (%s)", (version,))
+        conn.commit()
+
+    return max(current, SCHEMA_VERSION)
@@ -0,0 +1,314 @@
+import json
+import os
+import queue
+import select
+import socket
+import socketserver
+import struct
+import threading
+import time
+from collections import deque
+
+# Optional shared embedding service.
+# Run one process that holds the SBERT model:
+#     python embedding_server.py --address unix:/tmp/resume_embeddings.sock
+# and point every Streamlit process at it with RESUME_EMBEDDING_SERVER=unix:/tmp/resume_embeddings.sock
+# (or tcp:127.0.0.1:8765). Concurrent requests are coalesced into micro-batches.
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+DEFAULT_ADDRESS = "tcp:127.0.0.1:8765"
+
+# Every message is a 4-byte big-endian length followed by a UTF-8 JSON payload
+_HEADER = struct.Struct(">I")
+
+
+def parse_address(address):
+    """
+    Turns 'unix:/path/to.sock', 'tcp:host:port' or 'host:port' into
+    ('unix', path) or ('tcp', (host, port)).
+    """
+    if address.startswith("unix:"):
+        return "unix", address[len("unix:"):]
+    if address.startswith("tcp:"):
+        address = address[len("tcp:"):]
+    host, _, port = address.rpartition(":")
+    return "tcp", (host or "127.0.0.1", int(port))
+
+
+def _send_message(sock, payload):
+    data = json.dumps(payload).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv_message(sock):
+    """Reads one framed message, or returns None if the peer closed the connection."""
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    body = _recv_exact(sock, _HEADER.unpack(header)[0])
+    return None if body is None else json.loads(body.decode("utf-8"))
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class BatchMetrics:
+    """Counters for the batcher, plus a sliding window of recent batch sizes and queueing delays."""
+
+    def __init__(self, window=1000):
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+        self.texts = 0
+        self.batch_sizes = deque(maxlen=window)
+        self.queue_delays_ms = deque(maxlen=window)
+
+    def record(self, batch_size, delays_ms):
+        with self._lock:
+            self.batches += 1
+            self.requests += len(delays_ms)
+            self.texts += batch_size
+            self.batch_sizes.append(batch_size)
+            self.queue_delays_ms.extend(delays_ms)
+
+    def snapshot(self):
+        with self._lock:
+            sizes = list(self.batch_sizes)
+            delays = list(self.queue_delays_ms)
+            return {
+                "batches": self.batches,
+                "requests": self.requests,
+                "texts": self.texts,
+                "mean_batch_size": round(sum(sizes) / len(sizes), 2) if sizes else 0.0,
+                "max_batch_size": max(sizes, default=0),
+                "queue_delay_p50_ms": round(_percentile(delays, 50), 3),
+                "queue_delay_p95_ms": round(_percentile(delays, 95), 3),
+            }
+
+
+class _PendingRequest:
+    def __init__(self, texts):
+        self.texts = texts
+        self.enqueued_at = time.monotonic()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent encode requests into one model call.
+    A batch is flushed when it reaches max_batch_size texts or when the first
+    request in it has waited max_wait_ms, whichever comes first.
+    """
+
+    def __init__(self, encode_fn, max_batch_size=64, max_wait_ms=5):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.metrics = BatchMetrics()
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, texts):
+        """Blocks until the texts have been encoded as part of some batch and returns their vectors."""
+        request = _PendingRequest(list(texts))
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _collect_batch(self):
+        first = self._queue.get()
+        batch = [first]
+        size = len(first.texts)
+        deadline = first.enqueued_at + self.max_wait
+
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            started = time.monotonic()
+            texts = [text for request in batch for text in request.texts]
+
+            try:
+                vectors = self.encode_fn(texts)
+            except Exception as error:
+                for request in batch:
+                    request.error = error
+                    request.done.set()
+                continue
+
+            self.metrics.record(len(texts), [(started - request.enqueued_at) * 1000 for request in batch])
+
+            # Hand each caller back its own slice of the batch
+            offset = 0
+            for request in batch:
+                request.result = [list(map(float, vector)) for vector in vectors[offset:offset + len(request.texts)]]
+                offset += len(request.texts)
+                request.done.set()
+
+
+class _EmbeddingRequestHandler(socketserver.BaseRequestHandler):
+    """Serves framed JSON requests on one client connection until it closes."""
+
+    def handle(self):
+        while True:
+            message = _recv_message(self.request)
+            if message is None:
+                break
+
+            try:
+                if message.get("op") == "encode":
+                    response = {"embeddings": self.server.batcher.submit(message["texts"])}
+                elif message.get("op") == "metrics":
+                    response = self.server.batcher.metrics.snapshot()
+                else:
+                    response = {"error": f"Unknown op: {message.get('op')}"}
+            except Exception as error:
+                response = {"error": str(error)}
+
+            _send_message(self.request, response)
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+
+def create_server(address, batcher):
+    """Binds the embedding service on a Unix socket or localhost TCP port."""
+    kind, target = parse_address(address)
+    if kind == "unix":
+        if os.path.exists(target):
+            os.remove(target)
+        server = _UnixServer(target, _EmbeddingRequestHandler)
+    else:
+        server = _TCPServer(target, _EmbeddingRequestHandler)
+    server.batcher = batcher
+    return server
+
+
+class EmbeddingClient:
+    """
+    Client used by processor when RESUME_EMBEDDING_SERVER is set.
+    Keeps one connection per thread and reconnects if the server dropped it while it sat idle.
+    A request that was already sent is never re-sent: a timeout means the server is busy, and
+    sending the batch again would only add to its load.
+    """
+
+    def __init__(self, address, timeout=30):
+        self.address = address
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        kind, target = parse_address(self.address)
+        if kind == "unix":
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(target)
+        return sock
+
+    def _pooled_socket(self):
+        """This thread's connection, opened afresh if there is none or the server closed it."""
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            # An idle connection has nothing to read unless the server closed or reset it
+            readable, _, _ = select.select([sock], [], [], 0)
+            if readable:
+                self._drop(sock)
+                sock = None
+        if sock is None:
+            sock = self._local.sock = self._connect()
+        return sock
+
+    def _drop(self, sock):
+        self._local.sock = None
+        sock.close()
+
+    def _request(self, payload):
+        sock = self._pooled_socket()
+        try:
+            try:
+                _send_message(sock, payload)
+            except ConnectionError:
+                # Closed between the check and the send, so nothing reached the server: reconnect once
+                self._drop(sock)
+                sock = self._pooled_socket()
+                _send_message(sock, payload)
+            response = _recv_message(sock)
+        except OSError:
+            # Includes socket.timeout: the connection is in an unknown state, so it isn't reused
+            self._drop(sock)
+            raise
+        if response is None:
+            self._drop(sock)
+            raise ConnectionError("Embedding server closed the connection")
+
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        return response
+
+    def encode(self, texts):
+        """Returns one embedding (list of floats) per text."""
+        return self._request({"op": "encode", "texts": list(texts)})["embeddings"]
+
+    def metrics(self):
+        """Batch size and queueing delay stats from the server."""
+        return self._request({"op": "metrics"})
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Shared SBERT embedding server with micro-batching.")
+    parser.add_argument("--address", default=DEFAULT_ADDRESS, help="unix:/path.sock or tcp:host:port")
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(MODEL_NAME)
+    batcher = MicroBatcher(lambda texts: model.encode(texts, batch_size=len(texts)),
+                           max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+
+    with create_server(args.address, batcher) as server:
+        print(f"Embedding server listening on {args.address} (model: {MODEL_NAME})")
+        server.serve_forever()
@@ -0,0 +1,113 @@
+import csv
+import io
+import os
+import tempfile
+
+# pyarrow is optional: without it the Parquet export is simply not offered
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+EXPORT_FORMATS = ("csv", "parquet")
+CHUNK_ROWS = 5000
+
+
+def parquet_available():
+    return pa is not None
+
+
+def iter_csv_chunks(rows, columns, chunk_rows=CHUNK_ROWS):
+    """
+    Yields the CSV as UTF-8 byte chunks of up to chunk_rows rows each,
+    so the full file never has to exist as one string.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore')
+    writer.writeheader()
+
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % chunk_rows == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _arrow_schema(sample_row, columns, float_columns=()):
+    """
+    Typed columns inferred from one row: floats stay float64 (e.g. Score), ints int64, the rest strings.
+    Columns listed in float_columns are always float64, whatever the first row holds.
+    """
+    fields = []
+    for column in columns:
+        value = sample_row.get(column)
+        if column in float_columns:
+            arrow_type = pa.float64()
+        elif isinstance(value, bool):
+            arrow_type = pa.bool_()
+        elif isinstance(value, int):
+            arrow_type = pa.int64()
+        elif isinstance(value, float):
+            arrow_type = pa.float64()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column, arrow_type))
+    return pa.schema(fields)
+
+
+def write_parquet(rows, columns, sink, chunk_rows=CHUNK_ROWS, float_columns=()):
+    """Writes rows to a Parquet file/stream one row group per chunk."""
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return
+
+    schema = _arrow_schema(first, columns, float_columns)
+    with pq.ParquetWriter(sink, schema) as writer:
+        chunk = [first]
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_rows:
+                writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+                chunk = []
+        if chunk:
+            writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+
+
+def export_rows(rows, columns, file_format="csv", float_columns=()):
+    """
+    Streams rows into a temp file on disk and returns it reopened as a plain binary file
+    (io.BufferedReader, one of the types st.download_button accepts). The caller closes it.
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {file_format}")
+    if file_format == "parquet" and not parquet_available():
+        raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow")
+
+    with tempfile.NamedTemporaryFile(suffix=f".{file_format}", delete=False) as output:
+        path = output.name
+        try:
+            if file_format == "csv":
+                for chunk in iter_csv_chunks(rows, columns):
+                    output.write(chunk)
+            else:
+                write_parquet(rows, columns, output, float_columns=float_columns)
+        except Exception:
+            output.close()
+            os.remove(path)
+            raise
+
+    export = open(path, "rb")
+    # The open handle keeps the data readable, so the name can go right away
+    # (Windows won't unlink an open file; there it stays in the temp dir)
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    return export
@@ -0,0 +1,26 @@
+import bisect
+
+
+class Leaderboard:
+    """
+    Keeps ranking entries ordered by score (highest first) as they arrive,
+    so the current top-k can be shown at any point without re-sorting everything.
+    Entries with equal scores keep their arrival order, like a stable sort.
+    """
+
+    def __init__(self):
+        self._keys = []  # negated scores, ascending, for bisect
+        self._items = []
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, score, item):
+        """Inserts one entry in O(log n) search + O(n) list insert."""
+        position = bisect.bisect_right(self._keys, -score)
+        self._keys.insert(position, -score)
+        self._items.insert(position, item)
+
+    def top(self, k=None):
+        """Returns the k best entries (all of them if k is None), highest score first."""
+        return list(self._items[:k])
@@ -0,0 +1,270 @@
+"""
+Concurrent-session load test for the Streamlit app.
+
+Simulates N simultaneous job-seeker and recruiter sessions with Streamlit's AppTest,
+running resume analyses and bulk rankings over Kaggle_Test_PDFs/ against a throwaway
+SQLite database, and reports latency percentiles, throughput, CPU and memory per session count.
+
+AppTest swaps process-global Streamlit state on every run, so each session runs in its own
+process. Each process loads its own copy of the model unless RESUME_EMBEDDING_SERVER points
+them all at a shared embedding server.
+
+Usage:
+    python load_test.py --sessions 1,2,4,8 --iterations 2 --batch-size 10
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from streamlit.testing.v1 import AppTest
+
+from database_helper import get_db_connection
+
+MAIN_APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main_app.py")
+
+# AppTest can't drive st.file_uploader, so the driver swaps it for one that serves
+# the PDFs assigned to the current session, then runs the real app script.
+DRIVER_SCRIPT = f"""
+import runpy
+from io import BytesIO
+import streamlit as st
+
+
+def _load_test_file_uploader(label, accept_multiple_files=False, **kwargs):
+    uploads = []
+    for name, data in st.session_state.get("_load_test_files", []):
+        upload = BytesIO(data)
+        upload.name = name
+        uploads.append(upload)
+    if accept_multiple_files:
+        return uploads
+    return uploads[0] if uploads else None
+
+
+st.file_uploader = _load_test_file_uploader
+runpy.run_path({MAIN_APP_PATH!r}, run_name="__main__")
+"""
+
+SAMPLE_JDS = [
+    "Data scientist with Python, pandas, scikit-learn, machine learning, SQL and Tableau experience.",
+    "Java developer with Spring Boot, Hibernate, REST APIs, microservices and MySQL.",
+    "HR executive for recruitment, onboarding, payroll and employee relations.",
+    "DevOps engineer with Docker, Kubernetes, Jenkins, AWS and Linux scripting.",
+]
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _current_rss_mb():
+    """
+    Resident memory of this process in MB. Uses /proc on Linux, psutil if it's installed,
+    and otherwise the peak RSS from the resource module. Returns None if none of these are available.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, AttributeError, ValueError):
+        pass
+
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 ** 2
+    except ImportError:
+        pass
+
+    try:
+        import resource  # not available on Windows
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS but in kilobytes on Linux and the BSDs
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def use_throwaway_storage():
+    """
+    Points the app at a local SQLite stand-in, and always at a private search index and write spool
+    (the throwaway database's resume ids start at 1, so they would overwrite real users' indexed resumes).
+    Read on first use, so this runs in main() rather than at import time. Session processes inherit
+    the environment, so they all share it.
+    """
+    workdir = tempfile.mkdtemp(prefix="resume_load_test_")
+    os.environ.setdefault("RESUME_DB_BACKEND", "sqlite")
+    os.environ.setdefault("RESUME_DB_PATH", os.path.join(workdir, "load_test.db"))
+    os.environ["RESUME_INDEX_PATH"] = os.path.join(workdir, "resume_index.jsonl")
+    os.environ["RESUME_SPOOL_PATH"] = os.path.join(workdir, "write_spool.jsonl")
+    return workdir
+
+
+def load_pdfs(pdf_dir):
+    pdfs = []
+    for path in sorted(glob.glob(os.path.join(pdf_dir, "*.pdf"))):
+        with open(path, "rb") as pdf:
+            pdfs.append((os.path.basename(path), pdf.read()))
+    if not pdfs:
+        raise SystemExit(f"No PDFs found in '{pdf_dir}'. Run generate_pdfs.py first.")
+    return pdfs
+
+
+def create_user(role, index):
+    """Registers a throwaway account and returns its id (sessions start logged in, so the password is unused)."""
+    db = get_db_connection()
+    cursor = db.cursor()
+    cursor.execute("INSERT INTO users (full_name, email, password_hash, user_role) VALUES (%s, %s, %s, %s)",
+                   (f"Load {role} {index}", f"load_{role.replace(' ', '_').lower()}_{index}_{time.time_ns()}@test.local",
+                    "0" * 64, role))
+    user_id = cursor.lastrowid
+    db.commit()
+    db.close()
+    return user_id
+
+
+def _click(at, label):
+    return next(button for button in at.button if button.label == label).click()
+
+
+def run_session(role, user_id, pdfs, iterations, batch_size, timeout, start_barrier=None):
+    """
+    Drives one logged-in session through its workload (runs in its own process).
+    The first app run (imports, model load) happens before start_barrier, so sessions start their
+    timed actions together. Returns a dict with the latencies (seconds) of successful and failed
+    actions, the session's CPU seconds, its RSS and the start/end times of the timed part.
+    """
+    rng = random.Random(user_id)
+    at = AppTest.from_string(DRIVER_SCRIPT, default_timeout=timeout)
+    at.session_state["logged_in"] = True
+    at.session_state["user_role"] = role
+    at.session_state["username"] = f"Load {role}"
+    at.session_state["user_id"] = user_id
+    try:
+        at.run()
+    except Exception:
+        # Release the sessions already waiting at the barrier instead of leaving them hanging
+        if start_barrier is not None:
+            start_barrier.abort()
+        raise
+
+    if start_barrier is not None:
+        # Every session's first run ends within its own timeout, so a longer wait means one never got there
+        start_barrier.wait(timeout=2 * timeout)
+    cpu_before = time.process_time()
+    started = time.time()
+
+    latencies, failed = [], []
+    for _ in range(iterations):
+        jd = rng.choice(SAMPLE_JDS)
+        if role == "Job Seeker":
+            at.session_state["_load_test_files"] = [rng.choice(pdfs)]
+            at.text_area[0].input(jd)
+            button = "Analyze Resume"
+        else:
+            at.session_state["_load_test_files"] = rng.sample(pdfs, min(batch_size, len(pdfs)))
+            at.text_area[0].input(jd)
+            button = "Start Bulk Ranking"
+
+        start = time.perf_counter()
+        ok = True
+        try:
+            _click(at, button).run()
+            ok = not at.exception
+        except Exception as error:
+            print(f"  session {user_id} failed: {error}")
+            ok = False
+        (latencies if ok else failed).append(time.perf_counter() - start)
+
+    return {
+        "role": role,
+        "latencies": latencies,
+        "failed": failed,
+        "cpu_s": time.process_time() - cpu_before,
+        "rss_mb": _current_rss_mb(),
+        "started": started,
+        "finished": time.time(),
+    }
+
+
+def run_level(num_sessions, pdfs, iterations, batch_size, recruiter_share, timeout):
+    """Runs num_sessions concurrent sessions, one process each, and summarizes the results."""
+    recruiters = int(round(num_sessions * recruiter_share))
+    roles = ["Recruiter"] * recruiters + ["Job Seeker"] * (num_sessions - recruiters)
+    users = [(role, create_user(role, i)) for i, role in enumerate(roles)]
+
+    # spawn gives every session a clean interpreter (no forked Streamlit or model state)
+    context = multiprocessing.get_context("spawn")
+    with context.Manager() as manager:
+        start_barrier = manager.Barrier(num_sessions)
+        with ProcessPoolExecutor(max_workers=num_sessions, mp_context=context) as pool:
+            futures = [pool.submit(run_session, role, user_id, pdfs, iterations, batch_size, timeout, start_barrier)
+                       for role, user_id in users]
+            sessions = [future.result() for future in futures]
+
+    wall = max(s["finished"] for s in sessions) - min(s["started"] for s in sessions)
+    cpu = sum(s["cpu_s"] for s in sessions)
+    latencies = [value for s in sessions for value in s["latencies"]]
+    failed = [value for s in sessions for value in s["failed"]]
+    rss = [s["rss_mb"] for s in sessions if s["rss_mb"] is not None]
+
+    # Failed actions are reported on their own so quick failures don't flatter the percentiles
+    report = {
+        "sessions": num_sessions,
+        "actions": len(latencies) + len(failed),
+        "errors": len(failed),
+        "throughput_per_s": round(len(latencies) / wall, 3) if wall > 0 else 0.0,
+        "p50_s": round(_percentile(latencies, 50), 3),
+        "p95_s": round(_percentile(latencies, 95), 3),
+        "p99_s": round(_percentile(latencies, 99), 3),
+        "failed_p50_s": round(_percentile(failed, 50), 3),
+        "cpu_cores_used": round(cpu / wall, 2) if wall > 0 else 0.0,
+        "cpu_s_per_session": round(cpu / num_sessions, 2),
+        "rss_mb": round(sum(rss), 1) if rss else None,
+        "rss_mb_per_session": round(sum(rss) / len(rss), 1) if rss else None,
+    }
+    for role in ("Job Seeker", "Recruiter"):
+        values = [value for s in sessions if s["role"] == role for value in s["latencies"]]
+        if values:
+            key = "seeker" if role == "Job Seeker" else "recruiter"
+            report[f"{key}_p95_s"] = round(_percentile(values, 95), 3)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for main_app.py")
+    parser.add_argument("--sessions", default="1,2,4,8", help="comma-separated concurrent session counts")
+    parser.add_argument("--iterations", type=int, default=2, help="actions per session")
+    parser.add_argument("--batch-size", type=int, default=10, help="resumes per recruiter bulk ranking")
+    parser.add_argument("--recruiter-share", type=float, default=0.5, help="fraction of sessions that are recruiters")
+    parser.add_argument("--pdf-dir", default="Kaggle_Test_PDFs")
+    parser.add_argument("--timeout", type=float, default=600, help="per-action timeout in seconds")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    workdir = use_throwaway_storage()
+    pdfs = load_pdfs(args.pdf_dir)
+    print(f"Loaded {len(pdfs)} PDFs. Database: {os.environ['RESUME_DB_PATH']}, index and spool in {workdir}")
+
+    results = []
+    for num_sessions in [int(n) for n in args.sessions.split(",")]:
+        print(f"Running {num_sessions} concurrent session(s)...")
+        report = run_level(num_sessions, pdfs, args.iterations, args.batch_size, args.recruiter_share, args.timeout)
+        results.append(report)
+        print("  " + "  ".join(f"{key}={value}" for key, value in report.items()))
+
+    if args.json:
+        with open(args.json, "w") as out:
+            json.dump(results, out, indent=2)
+
+
+if __name__ == "__main__":
+    main()
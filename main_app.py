@@ -5,8 +5,10 @@ from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 import plotly.express as px
 import re
+import socket
 import spacy
 import hashlib
+import xlsxwriter
 
 # Load the spaCy model. If it's missing, tell the user how to get it.
 try:
@@ -18,12 +20,27 @@ except OSError:
 # Import our custom database functions and AI processing logic
 from database_helper import (
     get_db_connection,
-    save_analysis_to_db,
-    fetch_user_history,
-    save_full_shortlist,
-    fetch_recruiter_shortlists
+    fetch_user_history_page,
+    fetch_recruiter_shortlists_page,
+    get_signature_index
 )
-from processor import extract_text_from_pdf, calculate_match_score, find_missing_skills
+from write_behind import get_write_queue, SYNCED
+from processor import (
+    extract_text_from_pdf,
+    embed_and_score,
+    score_embedding,
+    encode_texts,
+    get_jd_embedding,
+    cached_jd_embedding,
+    find_missing_skills,
+    analyze_skill_gaps
+)
+from category_router import load_category_centroids, categorize_embeddings
+from search_index import get_resume_index, cascade_search
+from leaderboard import Leaderboard
+from scheduler import get_scheduler, SchedulerFull, INTERACTIVE, BULK
+from near_duplicates import LSHIndex, minhash_signature
+from export_helper import export_rows, parquet_available
 
 # Set up the basic Streamlit page config
 st.set_page_config(page_title="AI Resume Analyzer", layout="wide")
@@ -109,13 +126,14 @@ def extract_personal_info(text):
 def generate_excel(resume_name, score, missing_skills):
     """Creates a simple Excel file with the analysis results."""
     output = BytesIO()
-    df_data = pd.DataFrame([{
-        "Resume Name": resume_name,
-        "Match Score": f"{score}%",
-        "Missing Skills": ", ".join(missing_skills)
-    }])
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df_data.to_excel(writer, index=False, sheet_name='Analysis')
+    # One row doesn't need a DataFrame; write the cells directly and keep the score numeric
+    workbook = xlsxwriter.Workbook(output, {'in_memory': True})
+    sheet = workbook.add_worksheet('Analysis')
+    sheet.write_row(0, 0, ["Resume Name", "Match Score", "Missing Skills"], workbook.add_format({'bold': True}))
+    sheet.write_string(1, 0, resume_name)
+    sheet.write_number(1, 1, float(score), workbook.add_format({'num_format': '0.00"%"'}))
+    sheet.write_string(1, 2, ", ".join(missing_skills))
+    workbook.close()
     return output.getvalue()
 
 
@@ -143,6 +161,127 @@ def generate_pdf(resume_name, score, missing_skills):
     return buffer.getvalue()
 
 
+# --- PAGINATION HELPERS ---
+
+def load_pages(state_key, fetch_page, owner_id):
+    """
+    Keeps the pages loaded so far in session state, so "Load more" only fetches the next page.
+    Returns a dict with the accumulated 'rows' and the 'cursor' for the next page.
+    """
+    if state_key not in st.session_state:
+        rows, cursor = fetch_page(owner_id)
+        st.session_state[state_key] = {'rows': rows, 'cursor': cursor}
+    return st.session_state[state_key]
+
+
+def load_more_button(state_key, fetch_page, owner_id, label):
+    """Shows a "Load more" button while older rows remain and appends the next page when clicked."""
+    pages = st.session_state[state_key]
+    if pages['cursor'] and st.button(label, key=f"{state_key}_more"):
+        rows, cursor = fetch_page(owner_id, pages['cursor'])
+        pages['rows'].extend(rows)
+        pages['cursor'] = cursor
+        st.rerun()
+
+
+def show_sync_status(job_key, pages_key):
+    """
+    Reports the background DB write tracked under job_key.
+    Once it has synced, the cached pages are dropped so the new row shows up.
+    """
+    job_id = st.session_state.get(job_key)
+    if not job_id:
+        return
+
+    status = get_write_queue().status(job_id)
+    if status == SYNCED:
+        st.session_state.pop(job_key)
+        st.session_state.pop(pages_key, None)
+    elif status:
+        st.caption(f"Database sync status of your latest save: {status}")
+
+
+# --- SCHEDULING HELPERS ---
+
+def run_scheduled(user_id, priority, spinner_text, work, admit=True, queue_note=None):
+    """
+    Runs work() inside a scoring scheduler slot, showing the queue position while the node is saturated.
+    Jobs made of many steps pass one queue_note placeholder for all of them.
+    Returns work()'s result, or None if the server turned the job away or the embedding server timed out.
+    """
+    if queue_note is None:
+        queue_note = st.empty()
+
+    def show_position(position):
+        queue_note.info(f"Server is busy: queued, position {position}. Your job will start automatically.")
+
+    try:
+        with get_scheduler().slot(user_id, priority, on_wait=show_position, admit=admit):
+            queue_note.empty()
+            if spinner_text:
+                with st.spinner(spinner_text):
+                    return work()
+            return work()
+    except SchedulerFull:
+        queue_note.empty()
+        st.error("The server is at capacity right now. Please try again in a moment.")
+        return None
+    except socket.timeout:
+        queue_note.empty()
+        st.error("The embedding server is overloaded right now. Please try again in a moment.")
+        return None
+
+
+def score_candidate(file, text, jd_text, embedding=None):
+    """
+    Extraction, SBERT scoring and NER for one bulk-ranking candidate.
+    If the resume was already embedded for category routing, that vector is scored directly.
+    Returns (text, score, embedding, personal_info); the embedding is kept for the search index.
+    """
+    if text is None:
+        text = extract_text_from_pdf(file)
+    if embedding is not None and text:
+        score = score_embedding(embedding, jd_text)
+    else:
+        # (an empty resume scores 0.0 here, whether or not it went through category routing)
+        score, embedding = embed_and_score(text, jd_text)
+    return text, score, embedding, extract_personal_info(text)
+
+
+# --- RANKING VIEW HELPERS ---
+
+# While a bulk ranking runs, the chart and table are redrawn with the current top candidates
+LIVE_TOP_K = 15
+LIVE_REFRESH_EVERY = 5
+
+# Numeric ranking columns, kept as floats in the Parquet export
+RANKING_FLOAT_COLUMNS = ("Score", "Skill Coverage (%)")
+
+
+def collapse_near_duplicates(rows, enabled=True):
+    """Hides rows flagged as a near-duplicate of another resume in the same batch."""
+    if not enabled:
+        return rows
+    return [row for row in rows if not row.get("Duplicate Of")]
+
+
+def render_ranking(chart_slot, table_slot, rows, key):
+    """
+    Draws the ranking chart and table into their placeholders and returns the DataFrame shown.
+    Each redraw needs its own key: an unchanged top-k would otherwise repeat the chart's element ID.
+    """
+    df = pd.DataFrame(rows)
+
+    # Plotly bar chart
+    fig = px.bar(df, x='Score', y='File Name', orientation='h', title="Candidate Match Comparison",
+                 color='Score', color_continuous_scale='Blues', text='Score')
+    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=400)
+    chart_slot.plotly_chart(fig, use_container_width=True, key=f"ranking_chart_{key}")
+
+    table_slot.dataframe(df, use_container_width=True, hide_index=True)
+    return df
+
+
 # --- AUTHENTICATION FLOWS ---
 
 def login_page():
@@ -264,56 +403,63 @@ def job_seeker_dashboard():
 
     if st.button("Analyze Resume"):
         if uploaded_file and jd_text:
-            with st.spinner("AI is analyzing your profile semantics..."):
+            u_id = st.session_state['user_id']
+
+            def analyze():
                 # Extract text and run it through the NLP processor
                 resume_text = extract_text_from_pdf(uploaded_file)
-                score = calculate_match_score(resume_text, jd_text)
-                missing = find_missing_skills(resume_text, jd_text)
-
-                u_id = st.session_state['user_id']
-
-                # Try saving the result to the DB
-                if save_analysis_to_db(u_id, uploaded_file.name, jd_text, score, missing):
-                    st.success("Analysis complete and synced with your database!")
-
-                    # Show a quick summary table
-                    result_data = {"Feature": ["Resume Name", "Match Score", "Status"],
-                                   "Details": [uploaded_file.name, f"{score}%",
-                                               "High Match" if score >= 70 else "Needs Optimization"]}
-                    st.table(result_data)
-
-                    # List out what they are missing
-                    st.subheader("Skill Gap Analysis")
-                    if missing:
-                        st.info("The following keywords were found in the JD but are missing from your Resume:")
-                        for skill in missing: st.write(f"- Suggested Skill to add: {skill}")
-                    else:
-                        st.success("Excellent! Your resume covers all major keywords in the JD.")
-
-                    if score >= 70: st.balloons()
-
-                    # Provide download buttons
-                    st.write("---")
-                    st.subheader("Download Analysis Results")
-                    d_col1, d_col2 = st.columns(2)
-                    with d_col1:
-                        pdf_data = generate_pdf(uploaded_file.name, score, missing)
-                        st.download_button("Download Report (PDF)", pdf_data, f"Report_{uploaded_file.name}.pdf",
-                                           "application/pdf")
-                    with d_col2:
-                        excel_data = generate_excel(uploaded_file.name, score, missing)
-                        st.download_button("Export Data (Excel)", excel_data, f"Data_{uploaded_file.name}.xlsx",
-                                           "application/vnd.ms-excel")
+                score, resume_vector = embed_and_score(resume_text, jd_text)
+                return resume_text, score, resume_vector, find_missing_skills(resume_text, jd_text)
+
+            # Single analyses run at interactive priority, ahead of queued bulk rankings
+            analysis = run_scheduled(u_id, INTERACTIVE, "AI is analyzing your profile semantics...", analyze)
+            if analysis:
+                resume_text, score, resume_vector, missing = analysis
+
+                # Queue the DB write in the background and show the result straight away
+                st.session_state['history_sync_job'] = get_write_queue().submit(
+                    "analysis", user_id=u_id, resume_name=uploaded_file.name, jd_text=jd_text,
+                    score=score, gaps=missing, resume_text=resume_text, resume_vector=resume_vector)
+                st.success("Analysis complete! Saving to your history in the background.")
+
+                # Show a quick summary table
+                result_data = {"Feature": ["Resume Name", "Match Score", "Status"],
+                               "Details": [uploaded_file.name, f"{score}%",
+                                           "High Match" if score >= 70 else "Needs Optimization"]}
+                st.table(result_data)
+
+                # List out what they are missing
+                st.subheader("Skill Gap Analysis")
+                if missing:
+                    st.info("The following keywords were found in the JD but are missing from your Resume:")
+                    for skill in missing: st.write(f"- Suggested Skill to add: {skill}")
                 else:
-                    st.error("Error: Database sync failed.")
+                    st.success("Excellent! Your resume covers all major keywords in the JD.")
+
+                if score >= 70: st.balloons()
+
+                # Provide download buttons
+                st.write("---")
+                st.subheader("Download Analysis Results")
+                d_col1, d_col2 = st.columns(2)
+                with d_col1:
+                    pdf_data = generate_pdf(uploaded_file.name, score, missing)
+                    st.download_button("Download Report (PDF)", pdf_data, f"Report_{uploaded_file.name}.pdf",
+                                       "application/pdf")
+                with d_col2:
+                    excel_data = generate_excel(uploaded_file.name, score, missing)
+                    st.download_button("Export Data (Excel)", excel_data, f"Data_{uploaded_file.name}.xlsx",
+                                       "application/vnd.ms-excel")
         else:
             st.warning("Please upload a resume and paste the JD first.")
 
     st.markdown("---")
     st.subheader("Your Analysis History")
 
-    # Pull their past results from the DB
-    history = fetch_user_history(st.session_state['user_id'])
+    # Pull their past results from the DB, one page at a time
+    u_id = st.session_state['user_id']
+    show_sync_status('history_sync_job', 'history_pages')
+    history = load_pages('history_pages', fetch_user_history_page, u_id)['rows']
     if history:
         st.write("Review your previous resume analysis records:")
         cols = st.columns([2, 1, 3])
@@ -326,6 +472,8 @@ def job_seeker_dashboard():
             c1.info(record['file_name'])
             c2.success(f"{record['match_score']}%")
             c3.write(record['skill_gap_analysis'] if record['skill_gap_analysis'] else "Optimized Profile")
+
+        load_more_button('history_pages', fetch_user_history_page, u_id, "Load older analyses")
     else:
         st.info("No history found. Start analyzing to track your progress!")
 
@@ -357,75 +505,185 @@ def recruiter_dashboard():
         bulk_files = st.file_uploader("Upload Resumes (Max 100 PDF files)", accept_multiple_files=True,
                                       type=["pdf"])
 
+    # Optional category routing (only available once category_router.py has been run offline)
+    selected_categories = []
+    router = load_category_centroids()
+    if router:
+        category_names, _ = router
+        if target_jd:
+            # Reruns find the JD vector in the embedding cache; only a new JD takes a scheduler slot to encode it
+            jd_vector = cached_jd_embedding(target_jd)
+            if jd_vector is None:
+                jd_vector = run_scheduled(st.session_state['user_id'], INTERACTIVE, None,
+                                          lambda: get_jd_embedding(target_jd))
+            if jd_vector is not None:
+                jd_category = categorize_embeddings([jd_vector])[0]
+                st.caption(f"This JD looks like a **{jd_category}** role.")
+        selected_categories = st.multiselect("Only rank resumes from these categories (optional)", category_names)
+
+    collapse_duplicates = st.checkbox("Collapse near-duplicate resumes in the leaderboard", value=True)
+
     if st.button("Start Bulk Ranking"):
         if bulk_files and target_jd:
-            results = []
-            db_save_results = []  # We keep a separate list for the DB to avoid saving personal info
-            p_bar = st.progress(0)
-
-            with st.spinner(f"AI is processing {len(bulk_files)} candidates..."):
-                for i, file in enumerate(bulk_files):
-                    text = extract_text_from_pdf(file)
-                    score = calculate_match_score(text, target_jd)
-
-                    # Extract the personal details just for display
-                    ext_name, ext_email, ext_phone, ext_location = extract_personal_info(text)
-
-                    # Full details list (for the UI and CSV export)
-                    results.append({
-                        "File Name": file.name,
-                        "Candidate Name": ext_name,
-                        "Email": ext_email,
-                        "Phone": ext_phone,
-                        "Location": ext_location,
-                        "Score": score
-                    })
-
-                    # Clean list (only filename and score go to the DB)
-                    db_save_results.append({
-                        "Candidate": file.name,
-                        "Score": score
-                    })
-
-                    p_bar.progress((i + 1) / len(bulk_files))
-
-            # Sort both lists by score (highest first)
-            sorted_results = sorted(results, key=lambda x: x['Score'], reverse=True)
-            sorted_db_results = sorted(db_save_results, key=lambda x: x['Score'], reverse=True)
-
-            # Save the clean results to session state in case the recruiter wants to save the project later
-            st.session_state['last_ranking_results'] = sorted_db_results
-            st.session_state['last_jd_used'] = target_jd
-
-            # Display the results
-            df = pd.DataFrame(sorted_results)
-
-            st.write("---")
-            st.subheader("Visual Ranking Analysis")
-            chart_col, table_col = st.columns([1, 2])
-
-            with chart_col:
-                # Plotly bar chart
-                fig = px.bar(df, x='Score', y='File Name', orientation='h', title="Candidate Match Comparison",
-                             color='Score', color_continuous_scale='Blues', text='Score')
-                fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=400)
-                st.plotly_chart(fig, use_container_width=True)
-
-            with table_col:
-                st.write("**Top Candidates Leaderboard (Temporary View)**")
-                st.dataframe(df, use_container_width=True, hide_index=True)
-
-            # Show some quick stats about the batch
-            st.write("---")
-            st.subheader("Quick Statistics")
-            stat1, stat2, stat3 = st.columns(3)
-            stat1.metric("Total Resumes", len(bulk_files))
-            stat2.metric("Highest Score", f"{df['Score'].max()}%")
-            stat3.metric("Average Match", f"{round(df['Score'].mean(), 2)}%")
-
-            # Let them download the full report with emails and phones
-            csv = df.to_csv(index=False).encode('utf-8')
-            st.download_button("Export Full Ranking (CSV)", csv, "Candidate_Ranking.csv", "text/csv")
+            # One leaderboard holds (UI row, DB row) pairs, kept in score order as candidates finish
+            board = Leaderboard()
+
+            # Near-duplicate detection: within this batch, and against this recruiter's previously stored resumes
+            batch_signatures = LSHIndex()
+            stored_signatures = get_signature_index()
+            first_copy = {}  # candidate position -> position of the first near-identical copy seen
+
+            # Without a category filter, text is extracted lazily inside the loop so results start flowing at once
+            rec_id = st.session_state['user_id']
+            candidates = [(file, None, None) for file in bulk_files]
+
+            # Admission control happens once per bulk job; its per-file steps then just wait their turn
+            # (sharing one placeholder for the queue position)
+            admitted = not get_scheduler().is_saturated()
+            queue_note = st.empty()
+            if not admitted:
+                st.error("The server is at capacity right now. Please try again in a moment.")
+            elif selected_categories:
+                # Extract and embed everything first so the category filter can run as one batch.
+                # The same embeddings are reused to score the resumes that pass the filter.
+                def extract_and_route():
+                    texts = [extract_text_from_pdf(file) for file in bulk_files]
+                    embeddings = encode_texts(texts)
+                    return texts, embeddings, categorize_embeddings(embeddings)
+
+                routed = run_scheduled(rec_id, BULK, "Sorting resumes into categories...",
+                                       extract_and_route, admit=False, queue_note=queue_note)
+                if routed:
+                    texts, embeddings, labels = routed
+                    candidates = [(file, text, embedding)
+                                  for file, text, embedding, label in zip(bulk_files, texts, embeddings, labels)
+                                  if label in selected_categories]
+                    st.info(f"Category filter kept {len(candidates)} of {len(bulk_files)} resumes for full scoring.")
+                else:
+                    candidates = []
+
+            if candidates and admitted:
+                p_bar = st.progress(0)
+
+                # Placeholders that get redrawn in place as the ranking fills up
+                st.write("---")
+                st.subheader("Visual Ranking Analysis")
+                chart_col, table_col = st.columns([1, 2])
+                with chart_col:
+                    chart_slot = st.empty()
+                with table_col:
+                    st.write("**Top Candidates Leaderboard (Temporary View)**")
+                    table_slot = st.empty()
+
+                with st.spinner(f"AI is processing {len(candidates)} candidates..."):
+                    for i, (file, text, embedding) in enumerate(candidates):
+                        # Each file takes its own bulk-priority slot, so interactive analyses can slip in between
+                        processed = run_scheduled(rec_id, BULK, None,
+                                                  lambda: score_candidate(file, text, target_jd, embedding),
+                                                  admit=False, queue_note=queue_note)
+                        if processed is None:
+                            # The embedding server timed out; rank what was scored so far
+                            break
+
+                        # Personal details are extracted just for display
+                        text, score, vector, (ext_name, ext_email, ext_phone, ext_location) = processed
+
+                        # Check for edited copies of the same CV (sub-linear LSH lookups).
+                        # Resumes without any text have no signature and are never flagged.
+                        signature = minhash_signature(text)
+                        first_copy[i] = i
+                        stored_matches = []
+                        if signature is not None:
+                            batch_matches = batch_signatures.query(signature)
+                            if batch_matches:
+                                first_copy[i] = first_copy[batch_matches[0][0]]
+                            batch_signatures.add(i, signature)
+                            stored_matches = [str(res_id) for res_id, _ in
+                                              stored_signatures.query(signature, owner_id=rec_id)[:3]]
+
+                        # Full details row (for the UI and CSV export)
+                        ui_row = {
+                            "File Name": file.name,
+                            "Candidate Name": ext_name,
+                            "Email": ext_email,
+                            "Phone": ext_phone,
+                            "Location": ext_location,
+                            "Score": score,
+                            "Duplicate Of": candidates[first_copy[i]][0].name if first_copy[i] != i else "",
+                            "Previously Stored (Resume IDs)": ", ".join(stored_matches)
+                        }
+
+                        # Clean row (only filename and score go to the DB, the text and vector only feed the search index)
+                        db_row = {
+                            "Candidate": file.name,
+                            "Score": score,
+                            "Text": text,
+                            "Signature": signature,
+                            "Vector": vector
+                        }
+                        board.add(score, (ui_row, db_row))
+
+                        p_bar.progress((i + 1) / len(candidates))
+
+                        # Refresh the live top-k after every few candidates
+                        if (i + 1) % LIVE_REFRESH_EVERY == 0 and i + 1 < len(candidates):
+                            live_rows = [ui for ui, _ in board.top()]
+                            render_ranking(chart_slot, table_slot,
+                                           collapse_near_duplicates(live_rows, collapse_duplicates)[:LIVE_TOP_K],
+                                           key=f"live_{i + 1}")
+
+                ranked = board.top()
+
+                # Keyword gap analysis for the whole pool in one vectorized pass
+                gap_report = analyze_skill_gaps([db["Text"] for _, db in ranked], target_jd)
+                for (ui, _), gaps, coverage in zip(ranked, gap_report["gaps"], gap_report["coverage"]):
+                    ui["Skill Coverage (%)"] = coverage
+                    ui["Missing Skills"] = ", ".join(gaps)
+
+                # Save the clean results to session state in case the recruiter wants to save the project later
+                st.session_state['last_ranking_results'] = [db for _, db in ranked]
+                st.session_state['last_jd_used'] = target_jd
+
+                # Final view with every candidate (near-duplicates folded into their first copy if requested)
+                all_rows = [ui for ui, _ in ranked]
+                shown_rows = collapse_near_duplicates(all_rows, collapse_duplicates)
+                render_ranking(chart_slot, table_slot, shown_rows, key="final")
+                if len(shown_rows) < len(all_rows):
+                    st.caption(f"{len(all_rows) - len(shown_rows)} near-duplicate resumes collapsed "
+                               f"(still included in the CSV export).")
+
+                # Show some quick stats about the batch
+                st.write("---")
+                st.subheader("Quick Statistics")
+                scores = [row["Score"] for row in all_rows]
+                coverages = [row["Skill Coverage (%)"] for row in all_rows]
+                stat1, stat2, stat3, stat4 = st.columns(4)
+                stat1.metric("Total Resumes", len(bulk_files))
+                stat2.metric("Highest Score", f"{max(scores)}%")
+                stat3.metric("Average Match", f"{round(sum(scores) / len(scores), 2)}%")
+                stat4.metric("Average Skill Coverage", f"{round(sum(coverages) / len(coverages), 2)}%")
+
+                # Which JD keywords is this pool missing most often?
+                if gap_report["common_missing"]:
+                    st.write("**Most Common Missing Skills in This Pool**")
+                    st.dataframe(pd.DataFrame([{
+                        "Skill": skill,
+                        "Candidates Missing It": count,
+                        "% of Pool": round(count / len(ranked) * 100, 1)
+                    } for skill, count in gap_report["common_missing"]]), use_container_width=True, hide_index=True)
+
+                # Let them download the full report with emails and phones
+                # (streamed in chunks to a temp file instead of building a DataFrame + CSV string)
+                export_columns = list(all_rows[0].keys())
+                with export_rows(all_rows, export_columns, "csv") as csv_file:
+                    st.download_button("Export Full Ranking (CSV)", csv_file, "Candidate_Ranking.csv", "text/csv")
+                if parquet_available():
+                    with export_rows(all_rows, export_columns, "parquet",
+                                     float_columns=RANKING_FLOAT_COLUMNS) as parquet_file:
+                        st.download_button("Export Full Ranking (Parquet)", parquet_file, "Candidate_Ranking.parquet",
+                                           "application/vnd.apache.parquet")
+            elif admitted:
+                st.warning("No resumes matched the selected categories.")
         else:
             st.warning("Please provide a Job Description and resumes.")
 
@@ -434,7 +692,8 @@ def recruiter_dashboard():
         st.write("---")
         st.subheader(" Save Shortlist Project")
         st.info(
-            "Note: For data privacy, only File Names and Scores are saved. Personal info (Name/Email) will not be stored.")
+            "Note: For data privacy, only File Names and Scores are saved. Personal info (Name/Email) will not be stored. "
+            "Resume text is kept in the local search index so you can search your candidate pool later.")
 
         shortlist_name = st.text_input("Enter Project Name", placeholder="e.g., Software Engineer ")
 
@@ -444,18 +703,43 @@ def recruiter_dashboard():
                 jd_val = st.session_state['last_jd_used']
                 data_val = st.session_state['last_ranking_results']
 
-                if save_full_shortlist(rec_id, jd_val, shortlist_name, data_val):
-                    st.success(f"Shortlist '{shortlist_name}' saved successfully!")
-                    st.rerun()
+                st.session_state['shortlist_sync_job'] = get_write_queue().submit(
+                    "shortlist", recruiter_id=rec_id, jd_text=jd_val, title=shortlist_name,
+                    candidates_list=data_val)
+                st.success(f"Shortlist '{shortlist_name}' queued for saving!")
+                st.rerun()
             else:
                 st.warning("Please enter a project name.")
 
+    # --- SEARCH THE STORED CANDIDATE POOL ---
+    st.write("---")
+    st.subheader("Search Your Candidate Pool")
+    st.write("Finds the best stored resumes for the JD above: BM25 keyword search first, then SBERT re-ranking.")
+
+    if st.button("Search Stored Resumes"):
+        if target_jd:
+            pool = get_resume_index()
+            # Semantic re-ranking is scoring work too, so it waits its turn like a bulk job
+            search_owner = st.session_state.get('user_id')
+            hits = run_scheduled(search_owner, BULK, f"Searching {len(pool)} indexed resumes...",
+                                 lambda: cascade_search(pool, target_jd, owner_id=search_owner))
+            if hits:
+                st.dataframe(pd.DataFrame([{"Resume ID": doc_id, "Candidate": pool.doc_meta[doc_id]["name"],
+                                            "Score": score} for doc_id, score in hits]),
+                             use_container_width=True, hide_index=True)
+            elif hits is not None:
+                # (None means the scheduler turned the search away and already said so)
+                st.info("No stored resumes match this JD yet.")
+        else:
+            st.warning("Please enter a Job Description first.")
+
     # --- HISTORY VIEW FOR SAVED HIRING PROJECTS ---
     st.write("---")
     st.subheader("Saved Shortlists")
 
     recruiter_id = st.session_state.get('user_id')
-    saved_shortlists = fetch_recruiter_shortlists(recruiter_id)
+    show_sync_status('shortlist_sync_job', 'shortlist_pages')
+    saved_shortlists = load_pages('shortlist_pages', fetch_recruiter_shortlists_page, recruiter_id)['rows']
 
     if saved_shortlists:
         for slist in saved_shortlists:
@@ -483,6 +767,8 @@ def recruiter_dashboard():
                     st.dataframe(pd.DataFrame(items), use_container_width=True, hide_index=True)
                 else:
                     st.info("No candidates in this shortlist.")
+
+        load_more_button('shortlist_pages', fetch_recruiter_shortlists_page, recruiter_id, "Load older shortlists")
     else:
         st.info("No shortlists created yet. Rank candidates to start.")
 
@@ -0,0 +1,105 @@
+import hashlib
+import random
+import re
+import struct
+from collections import defaultdict
+
+# MinHash / LSH settings.
+# 128 permutations split into 32 bands of 4 rows. Two resumes with Jaccard similarity s share
+# at least one bucket with probability 1 - (1 - s^4)^32: about 0.87 at 0.5 and > 0.9999 at the
+# 0.8 threshold (the curve's knee sits near 0.42), so threshold-level duplicates are practically
+# never missed. Candidates are then confirmed against SIMILARITY_THRESHOLD.
+NUM_PERM = 128
+NUM_BANDS = 32
+SHINGLE_SIZE = 5
+SIMILARITY_THRESHOLD = 0.8
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed seed so signatures stay comparable across processes and restarts
+_rng = random.Random(1337)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+_PACKER = struct.Struct(f">{NUM_PERM}I")
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Overlapping word n-grams of the lowercased text."""
+    tokens = re.findall(r'\w+', text.lower())
+    if len(tokens) <= size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def minhash_signature(text):
+    """
+    MinHash signature (NUM_PERM 32-bit ints) of the text's shingle set.
+    Two signatures agree in each position with probability equal to the Jaccard similarity.
+    Returns None for text without any words (e.g. an image-only PDF): such resumes
+    can't be compared, and would otherwise all look identical.
+    """
+    hashes = [int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "big")
+              for shingle in shingles(text)]
+    if not hashes:
+        return None
+    return [min(((a * h + b) % _PRIME) & _MAX_HASH for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def estimate_similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity between two signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+def pack_signature(signature):
+    """Compact binary form for the resume_signatures table (512 bytes)."""
+    return _PACKER.pack(*signature)
+
+
+def unpack_signature(data):
+    return list(_PACKER.unpack(bytes(data)))
+
+
+class LSHIndex:
+    """
+    Locality-sensitive hashing index over MinHash signatures.
+    A query only compares against resumes that share at least one band bucket,
+    so lookups stay sub-linear in the size of the pool.
+    Each signature can carry its owner, so a query can be limited to one user's resumes.
+    """
+
+    def __init__(self, num_bands=NUM_BANDS, threshold=SIMILARITY_THRESHOLD):
+        self.num_bands = num_bands
+        self.rows = NUM_PERM // num_bands
+        self.threshold = threshold
+        self.buckets = defaultdict(set)
+        self.signatures = {}
+        self.owners = {}
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def _bands(self, signature):
+        for band in range(self.num_bands):
+            yield band, tuple(signature[band * self.rows:(band + 1) * self.rows])
+
+    def add(self, key, signature, owner_id=None):
+        self.signatures[key] = signature
+        self.owners[key] = owner_id
+        for band_key in self._bands(signature):
+            self.buckets[band_key].add(key)
+
+    def query(self, signature, owner_id=None):
+        """
+        Returns (key, estimated_similarity) pairs above the threshold, most similar first.
+        With owner_id, only that owner's signatures are considered.
+        """
+        candidates = set()
+        for band_key in self._bands(signature):
+            candidates.update(self.buckets.get(band_key, ()))
+        if owner_id is not None:
+            candidates = {key for key in candidates if self.owners[key] == owner_id}
+
+        matches = [(key, estimate_similarity(signature, self.signatures[key])) for key in candidates]
+        return sorted([m for m in matches if m[1] >= self.threshold], key=lambda m: m[1], reverse=True)
+
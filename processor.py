@@ -1,11 +1,33 @@
 import fitz  # PyMuPDF: Standard library for extracting raw text from document streams
 from sentence_transformers import SentenceTransformer
+from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+import numpy as np
+import os
 import re
+import socket
+import threading
+from collections import OrderedDict
+
+from embedding_server import MODEL_NAME, EmbeddingClient
+from text_utils import content_hash
+
+# If a shared embedding server is configured (see embedding_server.py), send encode calls there
+# instead of holding a private copy of the model in every Streamlit process.
+EMBEDDING_SERVER = os.environ.get("RESUME_EMBEDDING_SERVER")
+embedding_client = EmbeddingClient(EMBEDDING_SERVER) if EMBEDDING_SERVER else None
 
 # Load the SBERT model globally so we don't reload it on every request.
 # 'all-MiniLM-L6-v2' is fast and lightweight but still highly accurate for semantic matching.
-model = SentenceTransformer('all-MiniLM-L6-v2')
+# With an embedding server the local model is only loaded as a fallback if the server is unreachable.
+model = None if embedding_client else SentenceTransformer(MODEL_NAME)
+_model_lock = threading.Lock()
+
+# JD embeddings keyed by the same normalized content hash the database uses for job_descriptions,
+# so repeated analyses against one posting (and every file in a bulk ranking) reuse a single encode.
+JD_CACHE_SIZE = 256
+_jd_embedding_cache = OrderedDict()
+_jd_cache_lock = threading.Lock()
 
 
 def extract_text_from_pdf(pdf_file):
@@ -30,42 +52,157 @@ def extract_text_from_pdf(pdf_file):
         return f"Extraction Error: {error}"
 
 
+def _get_local_model():
+    global model
+    with _model_lock:
+        if model is None:
+            model = SentenceTransformer(MODEL_NAME)
+    return model
+
+
+def _encode(texts, batch_size=32):
+    """
+    Raw SBERT embeddings for a list of texts, via the shared server when configured.
+    Falls back to the in-process model if the server can't be reached or replies with an error
+    (but not when it just timed out: that is raised as socket.timeout).
+    """
+    if embedding_client:
+        try:
+            return np.asarray(embedding_client.encode(texts), dtype=np.float32)
+        except socket.timeout:
+            # The server is up but overloaded; a private model here would only add to the load
+            raise
+        except (OSError, RuntimeError) as error:
+            print(f"Embedding Server Error: {error}. Falling back to the local model.")
+    return _get_local_model().encode(list(texts), batch_size=batch_size)
+
+
+def cached_jd_embedding(jd_text):
+    """Returns the JD's embedding if it is already in the cache, or None (never encodes)."""
+    key = content_hash(jd_text)
+    with _jd_cache_lock:
+        if key in _jd_embedding_cache:
+            _jd_embedding_cache.move_to_end(key)
+            return _jd_embedding_cache[key]
+    return None
+
+
+def get_jd_embedding(jd_text):
+    """
+    Returns the SBERT embedding for a job description, encoding it only on a cache miss.
+    Uses a small LRU keyed by the JD content hash.
+    """
+    vector = cached_jd_embedding(jd_text)
+    if vector is not None:
+        return vector
+
+    key = content_hash(jd_text)
+    vector = _encode([jd_text])[0]
+
+    with _jd_cache_lock:
+        _jd_embedding_cache[key] = vector
+        if len(_jd_embedding_cache) > JD_CACHE_SIZE:
+            _jd_embedding_cache.popitem(last=False)
+    return vector
+
+
 def calculate_match_score(resume_text, jd_text):
     """
     Compares the resume and job description using SBERT embeddings.
     Returns a match score out of 100%.
     """
+    return embed_and_score(resume_text, jd_text)[0]
+
+
+def embed_and_score(resume_text, jd_text):
+    """
+    Like calculate_match_score, but also returns the resume's normalized embedding
+    (None for an empty resume), so it can go on to the search index without a second encode.
+    """
     if not resume_text or not jd_text:
-        return 0.0
+        return 0.0, None
 
-    # Convert both texts into numerical embeddings
-    text_vectors = model.encode([resume_text, jd_text])
+    # Convert the resume into a numerical embedding (the JD one usually comes from the cache)
+    vector = encode_texts([resume_text])[0]
+    return score_embedding(vector, jd_text), vector
+
+
+def score_embedding(resume_vector, jd_text):
+    """
+    Match score for a resume that has already been embedded (e.g. during category routing),
+    so it doesn't have to be encoded a second time.
+    """
+    jd_vector = get_jd_embedding(jd_text)
 
     # Calculate how close the two vectors are (Cosine Similarity)
     # This catches related skills even if the exact keywords don't match
-    match_calculation = cosine_similarity([text_vectors[0]], [text_vectors[1]])
+    match_calculation = cosine_similarity([resume_vector], [jd_vector])
 
     # Convert the raw similarity score (0 to 1) into a clean percentage
     final_score = round(float(match_calculation[0][0]) * 100, 2)
     return final_score
 
 
-def find_missing_skills(resume_text, jd_text):
+def encode_texts(texts, batch_size=32):
     """
-    A simple set-based approach to find words that are in the JD but missing from the resume.
-    Useful for quick keyword gap analysis.
+    Embeds a list of texts in one batched SBERT call.
+    Vectors are L2-normalized, so a plain dot product gives the cosine similarity.
     """
-    # Convert to lowercase and split into individual words
-    resume_tokens = set(re.findall(r'\w+', resume_text.lower()))
-    jd_tokens = set(re.findall(r'\w+', jd_text.lower()))
+    vectors = _encode(list(texts), batch_size)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
 
-    # Find what's in the JD that isn't in the resume
-    missing_elements = jd_tokens - resume_tokens
+# Basic stop word filtering to remove noise from keyword gaps.
+# (Note: In a larger production app, spaCy would handle this better)
+GAP_STOP_WORDS = {'and', 'the', 'with', 'for', 'from', 'this', 'that', 'should', 'have', 'must'}
 
-    # Basic stop word filtering to remove noise.
-    # (Note: In a larger production app, spaCy would handle this better)
-    stop_words = {'and', 'the', 'with', 'for', 'from', 'this', 'that', 'should', 'have', 'must'}
-    refined_gaps = [word for word in missing_elements if word not in stop_words and len(word) > 2]
 
+def _jd_keywords(jd_text):
+    """The JD's candidate skill keywords, tokenized once, in order of first appearance."""
+    tokens = re.findall(r'\w+', jd_text.lower())
+    return [word for word in dict.fromkeys(tokens) if word not in GAP_STOP_WORDS and len(word) > 2]
+
+
+def analyze_skill_gaps(resume_texts, jd_text, max_gaps=10, top_common=10):
+    """
+    Batch keyword gap analysis for many resumes against one JD.
+    The JD is tokenized once and all resumes go through a single sparse
+    document-term matrix restricted to the JD's keywords.
+
+    Returns a dict with:
+      'gaps'           - per resume, up to max_gaps JD keywords it is missing
+      'coverage'       - per resume, % of JD keywords it contains
+      'common_missing' - (keyword, number of resumes missing it), most common first
+    """
+    keywords = _jd_keywords(jd_text)
+    if not keywords or not resume_texts:
+        return {"gaps": [[] for _ in resume_texts], "coverage": [100.0 for _ in resume_texts],
+                "common_missing": []}
+
+    # N x V binary matrix: does resume i contain JD keyword j?
+    vectorizer = CountVectorizer(vocabulary=keywords, token_pattern=r'\w+', lowercase=True, binary=True)
+    matrix = vectorizer.transform(resume_texts).tocsr()
+
+    gaps = []
+    for row in range(matrix.shape[0]):
+        present = set(matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]])
+        gaps.append([word for idx, word in enumerate(keywords) if idx not in present][:max_gaps])
+
+    hits_per_resume = np.asarray(matrix.sum(axis=1)).ravel()
+    coverage = [round(float(hits) / len(keywords) * 100, 2) for hits in hits_per_resume]
+
+    # Pool-level view: how many resumes are missing each keyword
+    missing_counts = matrix.shape[0] - np.asarray(matrix.sum(axis=0)).ravel()
+    order = np.argsort(-missing_counts, kind="stable")
+    common_missing = [(keywords[idx], int(missing_counts[idx])) for idx in order[:top_common] if missing_counts[idx] > 0]
+
+    return {"gaps": gaps, "coverage": coverage, "common_missing": common_missing}
+
+
+def find_missing_skills(resume_text, jd_text):
+    """
+    Finds JD keywords that are missing from a single resume.
+    Runs the same CountVectorizer pass as analyze_skill_gaps, with a batch of one.
+    """
     # Return up to 10 missing keywords for the feedback report
-    return list(refined_gaps)[:10]
\ No newline at end of file
+    return analyze_skill_gaps([resume_text], jd_text)["gaps"][0]
@@ -0,0 +1,119 @@
+import heapq
+import itertools
+import os
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+# Priorities: lower runs first. A job seeker's single analysis jumps ahead of queued bulk work.
+INTERACTIVE = 0
+BULK = 1
+
+
+class SchedulerFull(Exception):
+    """Raised when the wait queue is already at capacity (admission control)."""
+
+
+class ScoringScheduler:
+    """
+    Gates extraction/scoring work behind a fixed concurrency budget.
+    Each unit of work runs inside slot(); waiting work is served by priority, then arrival order,
+    and no single user can hold more than per_user_limit slots at once.
+    """
+
+    def __init__(self, max_concurrency=None, per_user_limit=2, max_queue=100):
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self.per_user_limit = per_user_limit
+        self.max_queue = max_queue
+
+        self._cond = threading.Condition()
+        self._running = 0
+        self._running_per_user = Counter()
+        self._waiting = []  # heap of (priority, arrival, user_id)
+        self._arrivals = itertools.count()
+
+    def _next_eligible(self):
+        """The first waiting ticket (in priority order) whose user is still under quota."""
+        for ticket in sorted(self._waiting):
+            if self._running_per_user[ticket[2]] < self.per_user_limit:
+                return ticket
+        return None
+
+    def _position(self, ticket):
+        return 1 + sum(1 for other in self._waiting if other < ticket)
+
+    def is_saturated(self):
+        """True when new work would be turned away."""
+        with self._cond:
+            return len(self._waiting) >= self.max_queue
+
+    def stats(self):
+        with self._cond:
+            return {"running": self._running, "waiting": len(self._waiting), "capacity": self.max_concurrency}
+
+    @contextmanager
+    def slot(self, user_id, priority=INTERACTIVE, on_wait=None, poll_interval=0.5, admit=True):
+        """
+        Blocks until this unit of work may run, then holds a slot for the duration of the with-block.
+        While queued, on_wait(position) is called with the current queue position (1 = next up).
+        Raises SchedulerFull if too much work is already waiting, unless admit is False
+        (used for the later steps of a job that was already admitted).
+        """
+        with self._cond:
+            if admit and len(self._waiting) >= self.max_queue:
+                raise SchedulerFull(f"{len(self._waiting)} jobs are already waiting")
+            ticket = (priority, next(self._arrivals), user_id)
+            heapq.heappush(self._waiting, ticket)
+
+        acquired = False
+        try:
+            last_position = None
+            while True:
+                with self._cond:
+                    if self._running < self.max_concurrency and self._next_eligible() == ticket:
+                        self._waiting.remove(ticket)
+                        heapq.heapify(self._waiting)
+                        self._running += 1
+                        self._running_per_user[user_id] += 1
+                        acquired = True
+                        break
+                    position = self._position(ticket)
+
+                # Report outside the lock so a slow UI update never blocks the scheduler
+                if on_wait and position != last_position:
+                    on_wait(position)
+                    last_position = position
+
+                with self._cond:
+                    self._cond.wait(timeout=poll_interval)
+
+            yield
+        finally:
+            with self._cond:
+                if acquired:
+                    self._running -= 1
+                    self._running_per_user[user_id] -= 1
+                elif ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """
+    Returns the process-wide scheduler. The budget can be tuned with
+    RESUME_MAX_CONCURRENT_JOBS, RESUME_PER_USER_JOBS and RESUME_MAX_QUEUED_JOBS.
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = ScoringScheduler(
+                max_concurrency=int(os.environ.get("RESUME_MAX_CONCURRENT_JOBS", 0)) or None,
+                per_user_limit=int(os.environ.get("RESUME_PER_USER_JOBS", 2)),
+                max_queue=int(os.environ.get("RESUME_MAX_QUEUED_JOBS", 100)),
+            )
+        return _scheduler
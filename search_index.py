@@ -0,0 +1,372 @@
+import heapq
+import json
+import math
+import os
+import re
+import struct
+import threading
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+
+# Append-only log of indexed resumes. Replaying it on startup rebuilds the
+# in-memory inverted index, and each new resume costs a single appended line.
+# Set RESUME_INDEX_PATH to keep the index somewhere else (tests and the load harness use a temp dir).
+INDEX_PATH = "resume_index.jsonl"
+
+# The SBERT embeddings live next to the log in a binary file ("<log>.vectors"): an 8-byte header
+# (magic + dimension) followed by fixed-size (int64 id, float32 vector) records, appended as resumes come in.
+VECTOR_MAGIC = b"RIV1"
+VECTOR_HEADER = struct.Struct("<4sI")
+
+# Same lightweight stop word idea as processor.find_missing_skills
+STOP_WORDS = {'and', 'the', 'with', 'for', 'from', 'this', 'that', 'should', 'have', 'must',
+              'are', 'you', 'our', 'will', 'who', 'can', 'not', 'but', 'has', 'was', 'all'}
+
+
+def index_path():
+    """Location of the on-disk index log (RESUME_INDEX_PATH, or INDEX_PATH in the working directory)."""
+    return os.environ.get("RESUME_INDEX_PATH", INDEX_PATH)
+
+
+def vectors_path(path):
+    return path + ".vectors"
+
+
+def tokenize(text):
+    """Lowercases and splits text into index terms, dropping stop words and very short tokens."""
+    return [token for token in re.findall(r'\w+', text.lower()) if len(token) > 1 and token not in STOP_WORDS]
+
+
+class ResumeIndex:
+    """
+    In-memory BM25 inverted index over stored resume texts.
+    Maps each term to {resume_id: term_frequency} so a query only touches
+    the postings of its own terms instead of every stored resume.
+    The texts themselves are not kept; the embeddings sit in one float32 matrix
+    with a resume id -> row map.
+    All reads and writes go through the index's own lock, since resumes are added
+    from other sessions and the write-behind thread while searches run.
+    """
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(dict)
+        self.doc_lengths = {}
+        self.doc_meta = {}
+        self.total_length = 0
+        self._vectors = None
+        self._vector_rows = {}
+        self._free_rows = []
+        self._next_row = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self.doc_lengths)
+
+    def doc_ids(self):
+        with self._lock:
+            return list(self.doc_lengths)
+
+    def add_document(self, doc_id, text, name=None, owner_id=None, vector=None):
+        """Adds (or replaces) one resume in the index, with its embedding if it has one."""
+        with self._lock:
+            if doc_id in self.doc_lengths:
+                self.remove_document(doc_id)
+
+            terms = Counter(tokenize(text))
+            for term, freq in terms.items():
+                self.postings[term][doc_id] = freq
+
+            length = sum(terms.values())
+            self.doc_lengths[doc_id] = length
+            self.doc_meta[doc_id] = {"name": name, "owner_id": owner_id}
+            if vector is not None:
+                self._store_vector(doc_id, vector)
+            self.total_length += length
+
+    def remove_document(self, doc_id):
+        """
+        Drops a resume, its postings and its embedding.
+        Without the text this walks every posting list, which is fine for the rare replaced resume.
+        """
+        with self._lock:
+            for term in [term for term, postings in self.postings.items() if doc_id in postings]:
+                del self.postings[term][doc_id]
+                if not self.postings[term]:
+                    del self.postings[term]
+
+            self.total_length -= self.doc_lengths.pop(doc_id)
+            del self.doc_meta[doc_id]
+            row = self._vector_rows.pop(doc_id, None)
+            if row is not None:
+                self._free_rows.append(row)
+
+    def _store_vector(self, doc_id, vector):
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        if self._vectors is None:
+            self._vectors = np.zeros((1024, len(vector)), dtype=np.float32)
+
+        row = self._vector_rows.get(doc_id)
+        if row is None:
+            if self._free_rows:
+                row = self._free_rows.pop()
+            else:
+                row = self._next_row
+                self._next_row += 1
+                if row == len(self._vectors):
+                    # Grow by doubling, so appends stay amortized O(1)
+                    grown = np.zeros((2 * len(self._vectors), self._vectors.shape[1]), dtype=np.float32)
+                    grown[:row] = self._vectors
+                    self._vectors = grown
+            self._vector_rows[doc_id] = row
+        self._vectors[row] = vector
+
+    def _load_vectors(self, doc_ids, matrix):
+        """Bulk-loads embeddings read from disk into an index that has none yet (later rows win for repeated ids)."""
+        with self._lock:
+            last_row = {}
+            for position, doc_id in enumerate(doc_ids):
+                last_row[doc_id] = position
+            kept = [(doc_id, position) for doc_id, position in last_row.items() if doc_id in self.doc_lengths]
+            if not kept:
+                return
+            self._vectors = matrix[[position for _, position in kept]]
+            self._vector_rows = {doc_id: row for row, (doc_id, _) in enumerate(kept)}
+            self._free_rows = []
+            self._next_row = len(kept)
+
+    def set_vectors(self, vectors):
+        """Fills in embeddings ({doc_id: vector}) for resumes that are still indexed."""
+        with self._lock:
+            for doc_id, vector in vectors.items():
+                if doc_id in self.doc_lengths:
+                    self._store_vector(doc_id, vector)
+
+    def vectors(self, doc_ids):
+        """
+        Stored embeddings for the given resumes as (ids, float32 matrix with one row per id).
+        Resumes without an embedding (or no longer indexed) are left out.
+        """
+        with self._lock:
+            found = [(doc_id, self._vector_rows[doc_id]) for doc_id in doc_ids if doc_id in self._vector_rows]
+            if not found:
+                return [], np.empty((0, 0), dtype=np.float32)
+            return [doc_id for doc_id, _ in found], self._vectors[[row for _, row in found]]
+
+    def search(self, query, top_k=10, owner_id=None):
+        """
+        Scores resumes against the query with Okapi BM25.
+        Returns up to top_k (resume_id, score) pairs, best first.
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            num_docs = len(self.doc_lengths)
+            if num_docs == 0:
+                return []
+
+            avg_length = self.total_length / num_docs
+            scores = defaultdict(float)
+
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+
+                idf = math.log(1 + (num_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, freq in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] += idf * freq * (self.k1 + 1) / (freq + norm)
+
+            if owner_id is not None:
+                scores = {doc_id: score for doc_id, score in scores.items()
+                          if self.doc_meta[doc_id]["owner_id"] == owner_id}
+
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _record_dtype(dim):
+    return np.dtype([("id", "<i8"), ("vector", "<f4", (dim,))])
+
+
+def _read_vectors(path):
+    """Reads the vector file as (ids, matrix). A torn record at the end (from a crash mid-append) is cut off."""
+    if not os.path.exists(path) or os.path.getsize(path) < VECTOR_HEADER.size:
+        return [], None
+
+    with open(path, "rb") as store:
+        magic, dim = VECTOR_HEADER.unpack(store.read(VECTOR_HEADER.size))
+        if magic != VECTOR_MAGIC:
+            raise ValueError(f"{path} is not a resume vector file")
+        record = _record_dtype(dim)
+        count, torn = divmod(os.path.getsize(path) - VECTOR_HEADER.size, record.itemsize)
+        records = np.fromfile(store, dtype=record, count=count)
+
+    if torn:
+        os.truncate(path, VECTOR_HEADER.size + count * record.itemsize)
+    return records["id"].tolist(), records["vector"]
+
+
+def _append_vectors(path, doc_ids, vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    records = np.empty(len(doc_ids), dtype=_record_dtype(vectors.shape[1]))
+    records["id"] = doc_ids
+    records["vector"] = vectors
+
+    with open(path, "ab") as store:
+        if store.tell() == 0:
+            store.write(VECTOR_HEADER.pack(VECTOR_MAGIC, vectors.shape[1]))
+        store.write(records.tobytes())
+
+
+def _encode_missing(texts, encode=None):
+    """Embeds {doc_id: text} in one batch (lazily importing the model), returning {doc_id: vector}."""
+    if not texts:
+        return {}
+    if encode is None:
+        # Imported lazily so the index can be used without loading the model
+        from processor import encode_texts as encode
+    return dict(zip(texts, encode(list(texts.values()))))
+
+
+def _load_index(path, encode=None):
+    """
+    Replays the log and the vector file into a fresh index.
+    Resumes logged without a stored embedding (older logs) are encoded once here and appended to the vector file.
+    """
+    index = ResumeIndex()
+    stored_ids, matrix = _read_vectors(vectors_path(path))
+    has_vector = set(stored_ids)
+    missing = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as log:
+            for line in log:
+                entry = json.loads(line)
+                index.add_document(entry["id"], entry["text"], entry.get("name"), entry.get("owner_id"))
+                if entry["id"] in has_vector:
+                    missing.pop(entry["id"], None)
+                else:
+                    missing[entry["id"]] = entry["text"]
+
+    if stored_ids:
+        index._load_vectors(stored_ids, matrix)
+    if missing:
+        vectors = _encode_missing(missing, encode)
+        index.set_vectors(vectors)
+        _append_vectors(vectors_path(path), list(vectors), list(vectors.values()))
+    return index
+
+
+def get_resume_index(path=None, encode=None):
+    """Returns the process-wide index, replaying the on-disk log the first time."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = _load_index(path or index_path(), encode)
+        return _index
+
+
+def index_resumes(entries, path=None, encode=None):
+    """
+    Adds freshly stored resumes to the index and appends them to the on-disk log.
+    'entries' is a list of (resume_id, text, name, owner_id, vector) tuples, the vector being the
+    embedding computed while the resume was scored. Only entries without one are encoded here.
+    """
+    if not entries:
+        return
+    path = path or index_path()
+    computed = _encode_missing({doc_id: text for doc_id, text, _, _, vector in entries if vector is None}, encode)
+    vectors = [computed[doc_id] if vector is None else vector for doc_id, _, _, _, vector in entries]
+
+    index = get_resume_index(path, encode)
+    with _index_lock:
+        with open(path, "a", encoding="utf-8") as log:
+            for (doc_id, text, name, owner_id, _), vector in zip(entries, vectors):
+                index.add_document(doc_id, text, name, owner_id, vector)
+                log.write(json.dumps({"id": doc_id, "text": text, "name": name, "owner_id": owner_id}) + "\n")
+        _append_vectors(vectors_path(path), [doc_id for doc_id, _, _, _, _ in entries], vectors)
+
+
+def vector_scores(index, doc_ids, jd_text, jd_vector=None):
+    """
+    Cosine scores (0-100) of the stored resume embeddings against the JD,
+    as one matrix-vector product. Returns (ids, scores); resumes removed mid-search just drop out.
+    """
+    if jd_vector is None:
+        from processor import get_jd_embedding
+        jd_vector = get_jd_embedding(jd_text)
+
+    doc_ids, matrix = index.vectors(doc_ids)
+    if not doc_ids:
+        return [], []
+    jd_vector = np.asarray(jd_vector, dtype=np.float32)
+    similarities = matrix @ (jd_vector / np.linalg.norm(jd_vector))
+    return doc_ids, [round(float(similarity) * 100, 2) for similarity in similarities]
+
+
+def cascade_search(index, jd_text, lexical_k=2000, top_n=10, owner_id=None, jd_vector=None):
+    """
+    Two-stage retrieval: BM25 picks the top lexical_k resumes, then only those
+    are re-ranked semantically (a dot product against their stored embeddings).
+    Returns up to top_n (resume_id, score) pairs, best first.
+    """
+    hits = index.search(jd_text, top_k=lexical_k, owner_id=owner_id)
+    if not hits:
+        return []
+
+    doc_ids, scores = vector_scores(index, [doc_id for doc_id, _ in hits], jd_text, jd_vector)
+    return heapq.nlargest(top_n, zip(doc_ids, scores), key=lambda item: item[1])
+
+
+def benchmark_cascade(index, queries, cutoffs=(100, 500, 1000, 2000), top_n=10, encode=None):
+    """
+    Measures recall@top_n of the cascade against an exhaustive semantic scan,
+    plus the mean latency per query, for each lexical cutoff.
+    """
+    all_ids = index.doc_ids()
+    if encode is None:
+        from processor import encode_texts as encode
+    query_vectors = encode(list(queries))
+
+    # Ground truth: score every stored resume with the semantic model
+    truth = []
+    start = time.perf_counter()
+    for query, query_vector in zip(queries, query_vectors):
+        ids, scores = vector_scores(index, all_ids, query, query_vector)
+        best = heapq.nlargest(top_n, zip(ids, scores), key=lambda item: item[1])
+        truth.append({doc_id for doc_id, _ in best})
+    full_latency = (time.perf_counter() - start) / len(queries)
+
+    report = [{"cutoff": "full scan", "recall": 1.0, "latency_ms": round(full_latency * 1000, 2)}]
+    for cutoff in cutoffs:
+        recalls = []
+        start = time.perf_counter()
+        for query, query_vector, expected in zip(queries, query_vectors, truth):
+            found = {doc_id for doc_id, _ in cascade_search(index, query, cutoff, top_n, jd_vector=query_vector)}
+            recalls.append(len(found & expected) / len(expected) if expected else 1.0)
+        latency = (time.perf_counter() - start) / len(queries)
+
+        report.append({"cutoff": cutoff, "recall": round(sum(recalls) / len(recalls), 3),
+                       "latency_ms": round(latency * 1000, 2)})
+    return report
+
+
+if __name__ == "__main__":
+    import sys
+
+    pool = get_resume_index()
+    sample_queries = sys.argv[1:] or [
+        "Data scientist with Python, machine learning and SQL experience",
+        "Java developer with Spring Boot, Hibernate and REST APIs",
+        "HR executive handling recruitment, payroll and employee relations",
+    ]
+    print(f"Benchmarking cascade over {len(pool)} indexed resumes...")
+    for row in benchmark_cascade(pool, sample_queries):
+        print(f"  cutoff={row['cutoff']!s:>9}  recall@10={row['recall']:.3f}  latency={row['latency_ms']} ms")
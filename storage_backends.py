@@ -0,0 +1,221 @@
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+
+from db_schema import ensure_schema
+
+# Pick the engine with RESUME_DB_BACKEND=mysql|sqlite (MySQL stays the default).
+# The SQLite file location comes from RESUME_DB_PATH.
+DEFAULT_SQLITE_PATH = "resume_analyzer.db"
+
+
+class StorageBackend(ABC):
+    """
+    Common interface for the database engines.
+    connect() returns a DB-API style connection whose cursors accept the
+    %s-style queries used throughout database_helper and main_app,
+    and support cursor(dictionary=True).
+    """
+    name = None
+
+    # Dialect fragments used when rendering the schema DDL
+    ddl_types = {}
+
+    def __init__(self):
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    @abstractmethod
+    def _open(self):
+        """Opens a raw connection to the engine."""
+
+    def connect(self):
+        """Opens a new connection, making sure the schema is up to date the first time."""
+        conn = self._open()
+        if not self._schema_ready:
+            with self._schema_lock:
+                if not self._schema_ready:
+                    ensure_schema(conn, self)
+                    self._schema_ready = True
+        return conn
+
+    def render_ddl(self, statement):
+        return statement.format(**self.ddl_types)
+
+    @abstractmethod
+    def create_index(self, cursor, name, table, columns, unique=False):
+        """Creates the index unless it already exists."""
+
+    @abstractmethod
+    def drop_index(self, cursor, name, table):
+        """Drops the index if it exists."""
+
+    @abstractmethod
+    def insert_or_get_id(self, cursor, table, values, key_columns):
+        """
+        Upsert keyed on a unique (possibly multi-column) key: inserts the row unless one with
+        the same key already exists, and returns the id of whichever row holds that key.
+        """
+
+
+class MySQLBackend(StorageBackend):
+    """The original MySQL server setup (credentials can be overridden through the environment)."""
+    name = "mysql"
+    ddl_types = {"pk": "INT AUTO_INCREMENT PRIMARY KEY", "text": "LONGTEXT"}
+
+    def __init__(self, host=None, user=None, password=None, database=None):
+        super().__init__()
+        self.config = {
+            "host": host or os.environ.get("RESUME_DB_HOST", "localhost"),
+            "user": user or os.environ.get("RESUME_DB_USER", "root"),
+            "password": password or os.environ.get("RESUME_DB_PASSWORD", "12345"),
+            "database": database or os.environ.get("RESUME_DB_NAME", "resume_analyzer_db"),
+        }
+
+    def _open(self):
+        # Imported here so SQLite-only installs don't need the MySQL driver
+        import mysql.connector
+        return mysql.connector.connect(**self.config)
+
+    def create_index(self, cursor, name, table, columns, unique=False):
+        # MySQL has no CREATE INDEX IF NOT EXISTS, so check the catalog first
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        """, (table, name))
+        if cursor.fetchone()[0] == 0:
+            kind = "UNIQUE INDEX" if unique else "INDEX"
+            cursor.execute(f"CREATE {kind} {name} ON {table} ({', '.join(columns)})")
+
+    def drop_index(self, cursor, name, table):
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        """, (table, name))
+        if cursor.fetchone()[0] > 0:
+            cursor.execute(f"DROP INDEX {name} ON {table}")
+
+    def insert_or_get_id(self, cursor, table, values, key_columns):
+        # LAST_INSERT_ID(id) makes lastrowid point at the existing row on a duplicate key
+        columns = ", ".join(values)
+        placeholders = ", ".join(["%s"] * len(values))
+        cursor.execute(f"INSERT INTO {table} ({columns}) VALUES ({placeholders}) "
+                       f"ON DUPLICATE KEY UPDATE id = LAST_INSERT_ID(id)", tuple(values.values()))
+        return cursor.lastrowid
+
+
+class SQLiteCursor:
+    """Wraps a sqlite3 cursor so it speaks the same %s / dictionary=True API as mysql.connector."""
+
+    def __init__(self, cursor, dictionary=False):
+        self._cursor = cursor
+        self._dictionary = dictionary
+
+    def execute(self, query, params=()):
+        self._cursor.execute(query.replace("%s", "?"), tuple(params))
+        return self
+
+    def executemany(self, query, seq_of_params):
+        self._cursor.executemany(query.replace("%s", "?"), [tuple(p) for p in seq_of_params])
+        return self
+
+    def _convert(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return {col[0]: value for col, value in zip(self._cursor.description, row)}
+
+    def fetchone(self):
+        return self._convert(self._cursor.fetchone())
+
+    def fetchall(self):
+        return [self._convert(row) for row in self._cursor.fetchall()]
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """Thin connection wrapper handing out SQLiteCursor objects."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, dictionary=False):
+        return SQLiteCursor(self._conn.cursor(), dictionary)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+
+class SQLiteBackend(StorageBackend):
+    """Embedded single-file database in WAL mode, for single-node installs, tests and benchmarks."""
+    name = "sqlite"
+    ddl_types = {"pk": "INTEGER PRIMARY KEY AUTOINCREMENT", "text": "TEXT"}
+
+    def __init__(self, path=None):
+        super().__init__()
+        self.path = path or os.environ.get("RESUME_DB_PATH", DEFAULT_SQLITE_PATH)
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        # WAL lets readers keep going while a writer commits
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return SQLiteConnection(conn)
+
+    def create_index(self, cursor, name, table, columns, unique=False):
+        kind = "UNIQUE INDEX" if unique else "INDEX"
+        cursor.execute(f"CREATE {kind} IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
+
+    def drop_index(self, cursor, name, table):
+        cursor.execute(f"DROP INDEX IF EXISTS {name}")
+
+    def insert_or_get_id(self, cursor, table, values, key_columns):
+        columns = ", ".join(values)
+        placeholders = ", ".join(["%s"] * len(values))
+        cursor.execute(f"INSERT INTO {table} ({columns}) VALUES ({placeholders}) "
+                       f"ON CONFLICT({', '.join(key_columns)}) DO NOTHING", tuple(values.values()))
+        where = " AND ".join(f"{column} = %s" for column in key_columns)
+        cursor.execute(f"SELECT id FROM {table} WHERE {where}", tuple(values[column] for column in key_columns))
+        return cursor.fetchone()[0]
+
+
+BACKENDS = {
+    "mysql": MySQLBackend,
+    "sqlite": SQLiteBackend,
+}
+
+_active_backend = None
+
+
+def get_backend():
+    """Returns the configured backend, creating it on first use."""
+    global _active_backend
+    if _active_backend is None:
+        name = os.environ.get("RESUME_DB_BACKEND", "mysql").lower()
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown storage backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+        _active_backend = BACKENDS[name]()
+    return _active_backend
+
+
+def set_backend(backend):
+    """Swaps the active backend (e.g. an SQLiteBackend pointing at a temp file in tests)."""
+    global _active_backend
+    _active_backend = backend
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+from category_router import assign_categories, build_category_centroids, categorize_embeddings, load_category_centroids
+
+
+def test_assign_categories_picks_closest_centroid():
+    categories = ["Data Science", "HR"]
+    centroids = np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+    embeddings = np.array([[0.9, 0.1], [0.2, 0.8]])
+
+    assert assign_categories(embeddings, categories, centroids) == ["Data Science", "HR"]
+
+
+@patch('category_router.encode_texts')
+def test_build_and_load_centroids(mock_encode, tmp_path):
+    csv_path = tmp_path / "resumes.csv"
+    pd.DataFrame({
+        "Category": ["HR", "HR", "Java Developer"],
+        "Resume": ["recruiting", "payroll", "spring boot"]
+    }).to_csv(csv_path, index=False)
+
+    # One fake 2-D vector per resume
+    mock_encode.return_value = np.array([[0.0, 1.0], [0.0, 1.0], [1.0, 0.0]])
+
+    output_path = str(tmp_path / "centroids.npz")
+    categories = build_category_centroids(str(csv_path), output_path)
+
+    assert categories == ["HR", "Java Developer"]
+    loaded_categories, centroids = load_category_centroids(output_path)
+    assert loaded_categories == categories
+    assert centroids.shape == (2, 2)
+    assert assign_categories(np.array([[1.0, 0.0]]), loaded_categories, centroids) == ["Java Developer"]
+
+
+@patch('category_router.encode_texts')
+def test_missing_centroids_are_not_cached(mock_encode, tmp_path):
+    output_path = str(tmp_path / "centroids.npz")
+    assert load_category_centroids(output_path) is None
+
+    # Once the offline step has run, routing picks the file up without a restart
+    pd.DataFrame({"Category": ["HR"], "Resume": ["payroll"]}).to_csv(tmp_path / "resumes.csv", index=False)
+    mock_encode.return_value = np.array([[0.0, 1.0]])
+    build_category_centroids(str(tmp_path / "resumes.csv"), output_path)
+
+    assert load_category_centroids(output_path)[0] == ["HR"]
+    assert categorize_embeddings(np.array([[0.0, 1.0]]), output_path) == ["HR"]
@@ -3,6 +3,30 @@ from unittest.mock import MagicMock, patch
 from database_helper import save_analysis_to_db
 
 
+@pytest.fixture
+def sqlite_user(tmp_path):
+    """
+    Points the app at a throwaway SQLite database with one registered user.
+    Yields (backend, user_id) and restores the default backend afterwards.
+    """
+    from storage_backends import SQLiteBackend, set_backend
+    from database_helper import get_db_connection
+
+    backend = SQLiteBackend(str(tmp_path / "test.db"))
+    set_backend(backend)
+    try:
+        db = get_db_connection()
+        cursor = db.cursor()
+        cursor.execute("INSERT INTO users (full_name, email, password_hash, user_role) VALUES (%s, %s, %s, %s)",
+                       ("Test User", "user@example.com", "x" * 64, "Recruiter"))
+        user_id = cursor.lastrowid
+        db.commit()
+        db.close()
+        yield backend, user_id
+    finally:
+        set_backend(None)
+
+
 @patch('database_helper.get_db_connection')
 def test_save_analysis_to_db_success(mock_get_conn):
     # Setup: Create a mock database connection and cursor
@@ -26,4 +50,167 @@ def test_save_analysis_to_db_success(mock_get_conn):
     # Verify: Did it return True? Did it call commit?
     assert result is True
     assert mock_conn.commit.called
-    assert mock_cursor.execute.call_count == 3  # JD, Resume, and Analysis inserts
\ No newline at end of file
+    assert mock_cursor.execute.call_count == 3  # JD, Resume, and Analysis inserts
+
+def test_sqlite_backend_round_trip(sqlite_user):
+    # Same API, embedded engine: no MySQL server needed
+    from database_helper import fetch_user_history, save_full_shortlist, fetch_recruiter_shortlists, get_db_connection
+    _, user_id = sqlite_user
+
+    # WAL mode and the versioned schema indexes are in place
+    db = get_db_connection()
+    cursor = db.cursor()
+    cursor.execute("PRAGMA journal_mode")
+    assert cursor.fetchone()[0] == "wal"
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name = 'idx_analysis_user'")
+    assert cursor.fetchone() is not None
+    db.close()
+
+    assert save_analysis_to_db(user_id, "cv.pdf", "Need Python", 72.5, ["docker"]) is True
+    history = fetch_user_history(user_id)
+    assert history[0]['file_name'] == "cv.pdf"
+    assert history[0]['skill_gap_analysis'] == "docker"
+
+    assert save_full_shortlist(user_id, "Need Java", "Backend Hire",
+                               [{"Candidate": "a.pdf", "Score": 90.0}, {"Candidate": "b.pdf", "Score": 80.0}])
+    shortlists = fetch_recruiter_shortlists(user_id)
+    assert shortlists[0]['title'] == "Backend Hire"
+
+
+def test_identical_jds_are_stored_once(sqlite_user):
+    from database_helper import get_db_connection
+    _, user_id = sqlite_user
+
+    # Same posting pasted twice with different whitespace/case
+    assert save_analysis_to_db(user_id, "v1.pdf", "Need Python\n and SQL", 60.0, [])
+    assert save_analysis_to_db(user_id, "v2.pdf", "need python and   SQL", 70.0, [])
+
+    db = get_db_connection()
+    cursor = db.cursor()
+    cursor.execute("SELECT COUNT(*) FROM job_descriptions")
+    assert cursor.fetchone()[0] == 1
+    cursor.execute("SELECT COUNT(DISTINCT jd_id) FROM analysis_results")
+    assert cursor.fetchone()[0] == 1
+    db.close()
+
+
+def test_keyset_pagination_walks_history(sqlite_user):
+    from database_helper import fetch_user_history_page
+    _, user_id = sqlite_user
+
+    for i in range(5):
+        save_analysis_to_db(user_id, f"cv_{i}.pdf", "Need Python", float(i), [])
+
+    first, token = fetch_user_history_page(user_id, page_size=2)
+    second, token = fetch_user_history_page(user_id, token, page_size=2)
+    third, token = fetch_user_history_page(user_id, token, page_size=2)
+
+    names = [row['file_name'] for row in first + second + third]
+    assert names == ["cv_4.pdf", "cv_3.pdf", "cv_2.pdf", "cv_1.pdf", "cv_0.pdf"]
+    assert token is None
+
+
+def test_save_write_batch_commits_mixed_jobs(sqlite_user):
+    from database_helper import save_write_batch, fetch_user_history, fetch_recruiter_shortlists
+    _, user_id = sqlite_user
+
+    assert save_write_batch([
+        {"kind": "analysis", "payload": {"user_id": user_id, "resume_name": "cv.pdf", "jd_text": "Need Go",
+                                         "score": 50.0, "gaps": ["go"]}},
+        {"kind": "shortlist", "payload": {"recruiter_id": user_id, "jd_text": "Need Go", "title": "Go Devs",
+                                          "candidates_list": [{"Candidate": "a.pdf", "Score": 77.0}]}},
+    ])
+
+    assert fetch_user_history(user_id)[0]['file_name'] == "a.pdf"
+    assert fetch_recruiter_shortlists(user_id)[0]['title'] == "Go Devs"
+
+
+def test_signatures_are_stored_and_indexed(sqlite_user):
+    import database_helper
+    from near_duplicates import minhash_signature
+    _, user_id = sqlite_user
+
+    database_helper._signature_index = None
+    try:
+        signature = minhash_signature("Senior Java developer with Spring Boot, Kafka and microservices experience")
+        assert database_helper.save_full_shortlist(user_id, "Need Java", "Java",
+                                                   [{"Candidate": "a.pdf", "Score": 80.0, "Signature": signature}])
+
+        # Loaded from the database on first use, then matched through LSH
+        index = database_helper.get_signature_index()
+        assert len(index) == 1
+        assert index.query(signature)[0][1] == 1.0
+    finally:
+        database_helper._signature_index = None
+
+
+def test_scoring_vectors_are_passed_to_the_search_index(sqlite_user, monkeypatch):
+    import database_helper
+    _, user_id = sqlite_user
+    indexed = []
+    monkeypatch.setattr(database_helper, "index_resumes", indexed.extend)
+
+    assert database_helper.save_full_shortlist(user_id, "Need Go", "Go", [
+        {"Candidate": "a.pdf", "Score": 80.0, "Text": "Go developer", "Vector": [0.6, 0.8]},
+        {"Candidate": "b.pdf", "Score": 40.0, "Text": "Java developer"},
+    ])
+
+    assert [(name, vector) for _, _, name, _, vector in indexed] == [("a.pdf", [0.6, 0.8]), ("b.pdf", None)]
+
+
+def test_storage_backend_is_abstract():
+    from storage_backends import StorageBackend
+
+    with pytest.raises(TypeError):
+        StorageBackend()
+
+
+def test_jd_dedupe_is_scoped_to_its_author(sqlite_user):
+    from database_helper import get_db_connection, save_full_shortlist, fetch_recruiter_shortlists
+    _, seeker_id = sqlite_user
+
+    db = get_db_connection()
+    cursor = db.cursor()
+    recruiters = []
+    for email in ("r1@example.com", "r2@example.com"):
+        cursor.execute("INSERT INTO users (full_name, email, password_hash, user_role) VALUES (%s, %s, %s, %s)",
+                       ("Recruiter", email, "x" * 64, "Recruiter"))
+        recruiters.append(cursor.lastrowid)
+    db.commit()
+    db.close()
+
+    # A job seeker analyses the posting first, then two recruiters shortlist against it
+    assert save_analysis_to_db(seeker_id, "cv.pdf", "Need Go", 50.0, [])
+    assert save_full_shortlist(recruiters[0], "Need Go", "Backend Q3", [{"Candidate": "a.pdf", "Score": 70.0}])
+    assert save_full_shortlist(recruiters[1], "Need Go", "Platform hire", [{"Candidate": "b.pdf", "Score": 60.0}])
+
+    assert fetch_recruiter_shortlists(recruiters[0])[0]['job_title'] == "Backend Q3"
+    assert fetch_recruiter_shortlists(recruiters[1])[0]['job_title'] == "Platform hire"
+
+    # The same recruiter reusing the posting for a new project still sees that project's title
+    assert save_full_shortlist(recruiters[0], "Need Go", "Backend Q4 rehire", [{"Candidate": "c.pdf", "Score": 65.0}])
+    assert [(row['title'], row['job_title']) for row in fetch_recruiter_shortlists(recruiters[0])] == [
+        ("Backend Q4 rehire", "Backend Q4 rehire"), ("Backend Q3", "Backend Q3")]
+
+
+def test_signature_index_is_scoped_to_owner(sqlite_user, monkeypatch):
+    import database_helper
+    from near_duplicates import minhash_signature
+    _, seeker_id = sqlite_user
+    indexed = []
+    monkeypatch.setattr(database_helper, "index_resumes", indexed.extend)
+
+    database_helper._signature_index = None
+    try:
+        text = "Senior Java developer with Spring Boot, Kafka and microservices experience in banking"
+        assert database_helper.save_analysis_to_db(seeker_id, "mine.pdf", "Need Java", 70.0, [], resume_text=text)
+        # Text without any words stores no signature
+        assert database_helper.save_analysis_to_db(seeker_id, "scan.pdf", "Need Java", 0.0, [], resume_text="  ")
+
+        index = database_helper.get_signature_index()
+        assert len(index) == 1
+        assert [entry[2] for entry in indexed] == ["mine.pdf"]  # the blank resume isn't search-indexed either
+        assert index.query(minhash_signature(text), owner_id=seeker_id)
+        assert index.query(minhash_signature(text), owner_id=seeker_id + 1) == []
+    finally:
+        database_helper._signature_index = None
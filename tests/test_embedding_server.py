@@ -0,0 +1,84 @@
+import socket
+import threading
+import time
+import pytest
+from embedding_server import MicroBatcher, EmbeddingClient, create_server, parse_address
+
+
+def fake_encode(texts):
+    # Slow enough that concurrent requests pile up behind the first batch
+    time.sleep(0.05)
+    return [[float(len(text)), 1.0] for text in texts]
+
+
+def test_parse_address():
+    assert parse_address("unix:/tmp/embed.sock") == ("unix", "/tmp/embed.sock")
+    assert parse_address("tcp:127.0.0.1:9000") == ("tcp", ("127.0.0.1", 9000))
+    assert parse_address("localhost:9000") == ("tcp", ("localhost", 9000))
+
+
+def test_micro_batcher_coalesces_concurrent_requests():
+    batcher = MicroBatcher(fake_encode, max_batch_size=64, max_wait_ms=20)
+    results = {}
+
+    def worker(i):
+        results[i] = batcher.submit(["x" * i, "y"])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(1, 9)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Every caller gets back exactly its own vectors
+    for i in range(1, 9):
+        assert results[i] == [[float(i), 1.0], [1.0, 1.0]]
+
+    stats = batcher.metrics.snapshot()
+    assert stats["requests"] == 8
+    assert stats["batches"] < 8
+    assert stats["max_batch_size"] > 2
+
+
+def test_client_server_round_trip():
+    server = create_server("tcp:127.0.0.1:0", MicroBatcher(fake_encode, max_wait_ms=1))
+    host, port = server.server_address
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        client = EmbeddingClient(f"tcp:{host}:{port}")
+        assert client.encode(["abc", "de"]) == [[3.0, 1.0], [2.0, 1.0]]
+        assert client.metrics()["texts"] == 2
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_client_reconnects_after_idle_close_but_never_resends_on_timeout():
+    calls = []
+
+    def slow_encode(texts):
+        calls.append(texts)
+        time.sleep(0.3 if texts == ["slow"] else 0)
+        return [[1.0] for _ in texts]
+
+    server = create_server("tcp:127.0.0.1:0", MicroBatcher(slow_encode, max_wait_ms=1))
+    host, port = server.server_address
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        client = EmbeddingClient(f"tcp:{host}:{port}", timeout=0.1)
+        assert client.encode(["a"]) == [[1.0]]
+
+        # The server drops the idle pooled connection: the next call just reconnects
+        client._local.sock.shutdown(socket.SHUT_RDWR)
+        assert client.encode(["b"]) == [[1.0]]
+
+        # A timed-out request is raised straight away, not sent a second time
+        with pytest.raises(socket.timeout):
+            client.encode(["slow"])
+        time.sleep(0.4)
+        assert calls.count(["slow"]) == 1
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,56 @@
+import csv
+import io
+
+import pytest
+
+from export_helper import export_rows, iter_csv_chunks
+
+COLUMNS = ["File Name", "Score", "Missing Skills"]
+
+
+def _rows(n):
+    return [{"File Name": f"cv_{i}.pdf", "Score": 50.0 + i / 10, "Missing Skills": "docker, aws"} for i in range(n)]
+
+
+def test_csv_is_streamed_in_chunks_and_round_trips():
+    rows = _rows(25)
+    chunks = list(iter_csv_chunks(iter(rows), COLUMNS, chunk_rows=10))
+
+    # 10 + 10 + 5 rows (the header rides along in the first chunk)
+    assert len(chunks) == 3
+    parsed = list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+    assert [row["File Name"] for row in parsed] == [row["File Name"] for row in rows]
+    assert float(parsed[-1]["Score"]) == rows[-1]["Score"]
+
+
+def test_export_rows_returns_a_rewound_file():
+    with export_rows(_rows(3), COLUMNS, "csv") as export:
+        assert export.read().decode("utf-8").splitlines()[0] == "File Name,Score,Missing Skills"
+
+    with pytest.raises(ValueError):
+        export_rows(_rows(1), COLUMNS, "xml")
+
+
+def test_parquet_keeps_score_as_a_float():
+    pq = pytest.importorskip("pyarrow.parquet")
+    rows = _rows(12)
+    rows[0]["Score"] = 0  # an int in the first row must not turn the column into int64
+
+    with export_rows(rows, COLUMNS, "parquet", float_columns=("Score",)) as export:
+        table = pq.read_table(export)
+    assert table.num_rows == 12
+    assert str(table.schema.field("Score").type) == "double"
+    assert str(table.schema.field("File Name").type) == "string"
+
+
+@pytest.mark.parametrize("file_format", ["csv", "parquet"])
+def test_exports_are_accepted_by_download_button(file_format):
+    # Runs the export through the same conversion st.download_button uses
+    download_data_util = pytest.importorskip("streamlit.runtime.download_data_util")
+    if file_format == "parquet":
+        pytest.importorskip("pyarrow")
+
+    with export_rows(_rows(5), COLUMNS, file_format, float_columns=("Score",)) as export:
+        data, _ = download_data_util.convert_data_to_bytes_and_infer_mime(export, TypeError("unsupported"))
+
+    assert data.startswith(b"File Name,Score" if file_format == "csv" else b"PAR1")
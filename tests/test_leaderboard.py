@@ -0,0 +1,12 @@
+from leaderboard import Leaderboard
+
+
+def test_leaderboard_keeps_entries_sorted_as_they_arrive():
+    board = Leaderboard()
+    for name, score in [("a.pdf", 55.0), ("b.pdf", 91.2), ("c.pdf", 70.0), ("d.pdf", 91.2)]:
+        board.add(score, name)
+
+    # Ties keep arrival order, same as sorted(..., reverse=True)
+    assert board.top() == ["b.pdf", "d.pdf", "c.pdf", "a.pdf"]
+    assert board.top(2) == ["b.pdf", "d.pdf"]
+    assert len(board) == 4
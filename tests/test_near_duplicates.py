@@ -0,0 +1,38 @@
+from near_duplicates import LSHIndex, estimate_similarity, minhash_signature, pack_signature, unpack_signature
+
+BASE_CV = ("Experienced Python developer with five years of experience building REST APIs using Django "
+           "and Flask, deploying services on AWS with Docker and Kubernetes, writing SQL for PostgreSQL "
+           "and MySQL databases, mentoring junior engineers and leading code reviews in agile teams "
+           "across fintech and healthcare domains with a focus on testing and reliability")
+
+
+def test_edited_copy_is_detected_but_different_cv_is_not():
+    edited = BASE_CV + " and strong communication skills"
+    other = ("Certified HR executive managing recruitment pipelines, payroll processing, onboarding, "
+             "employee relations, statutory compliance and training programmes for a retail chain")
+
+    original_sig = minhash_signature(BASE_CV)
+    assert estimate_similarity(original_sig, minhash_signature(edited)) >= 0.8
+    assert estimate_similarity(original_sig, minhash_signature(other)) < 0.2
+
+    index = LSHIndex()
+    index.add("original.pdf", original_sig)
+    assert [key for key, _ in index.query(minhash_signature(edited))] == ["original.pdf"]
+    assert index.query(minhash_signature(other)) == []
+
+
+def test_owner_filter_and_signature_packing():
+    signature = minhash_signature(BASE_CV)
+    index = LSHIndex()
+    index.add(1, signature, owner_id=7)
+    index.add(2, minhash_signature(BASE_CV + " references available on request"), owner_id=8)
+
+    assert sorted(key for key, _ in index.query(signature)) == [1, 2]
+    assert [key for key, _ in index.query(signature, owner_id=8)] == [2]
+    assert unpack_signature(pack_signature(signature)) == signature
+
+
+def test_texts_without_words_have_no_signature():
+    # Image-only PDFs must not all collapse into one "duplicate" cluster
+    assert minhash_signature("") is None
+    assert minhash_signature("  ...  ") is None
@@ -25,4 +25,67 @@ def test_find_missing_skills():
     assert "docker" in gaps
     assert "kubernetes" in gaps
     # Check that 'python' is NOT in gaps
-    assert "python" not in gaps
\ No newline at end of file
+    assert "python" not in gaps
+
+def test_jd_embedding_is_reused_for_identical_jd():
+    from unittest.mock import patch
+    import processor
+
+    jd = "Looking for a   Python developer who knows SQL."
+    processor.get_jd_embedding(jd)
+
+    # Whitespace/case differences normalize to the same content hash, so no new encode happens
+    with patch.object(processor.model, 'encode') as mock_encode:
+        processor.get_jd_embedding("looking for a python developer who knows sql.")
+        mock_encode.assert_not_called()
+
+    # The cache-only lookup (used before taking a scheduler slot) never encodes
+    assert processor.cached_jd_embedding("looking for a python developer who knows sql.") is not None
+    assert processor.cached_jd_embedding("A JD nobody has pasted yet") is None
+
+
+def test_analyze_skill_gaps_batch():
+    from processor import analyze_skill_gaps
+
+    jd = "Requirements: Python, Docker, Kubernetes"
+    report = analyze_skill_gaps(["Python and Docker expert", "Java developer", "Python, Docker, Kubernetes"], jd)
+
+    assert report["gaps"][0] == ["requirements", "kubernetes"]
+    assert report["coverage"] == [50.0, 0.0, 75.0]
+    # 'requirements' and 'kubernetes' are missing from 3 and 2 resumes respectively
+    assert report["common_missing"][0] == ("requirements", 3)
+    assert ("kubernetes", 2) in report["common_missing"]
+
+
+def test_encode_falls_back_when_server_replies_with_error():
+    from unittest.mock import MagicMock, patch
+    import processor
+
+    client = MagicMock()
+    client.encode.side_effect = RuntimeError("model failed on the server")
+    local = MagicMock()
+    local.encode.return_value = [[0.5, 0.5]]
+
+    with patch.object(processor, 'embedding_client', client), patch.object(processor, '_get_local_model',
+                                                                           return_value=local):
+        vectors = processor._encode(["some resume"])
+
+    assert list(vectors[0]) == [0.5, 0.5]
+    local.encode.assert_called_once()
+
+
+def test_encode_does_not_load_the_local_model_on_a_server_timeout():
+    import socket
+    from unittest.mock import MagicMock, patch
+    import processor
+
+    client = MagicMock()
+    client.encode.side_effect = socket.timeout("timed out")
+    local_model = MagicMock()
+
+    with patch.object(processor, 'embedding_client', client), patch.object(processor, '_get_local_model',
+                                                                           local_model):
+        with pytest.raises(socket.timeout):
+            processor._encode(["some resume"])
+
+    local_model.assert_not_called()
@@ -0,0 +1,59 @@
+import threading
+import time
+import pytest
+from scheduler import ScoringScheduler, SchedulerFull, INTERACTIVE, BULK
+
+
+def test_interactive_work_jumps_ahead_of_queued_bulk_work():
+    scheduler = ScoringScheduler(max_concurrency=1, per_user_limit=5)
+    order = []
+    positions = []
+    release = threading.Event()
+
+    def blocker():
+        with scheduler.slot("recruiter", BULK):
+            release.wait()
+
+    def job(user_id, priority, name):
+        with scheduler.slot(user_id, priority, on_wait=positions.append, poll_interval=0.01):
+            order.append(name)
+
+    threads = [threading.Thread(target=blocker)]
+    threads[0].start()
+    time.sleep(0.05)
+
+    # Bulk work queues first, then a job seeker arrives
+    for user_id, priority, name in [("recruiter", BULK, "bulk"), ("seeker", INTERACTIVE, "interactive")]:
+        thread = threading.Thread(target=job, args=(user_id, priority, name))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.05)
+
+    assert scheduler.stats() == {"running": 1, "waiting": 2, "capacity": 1}
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert order == ["interactive", "bulk"]
+    assert 1 in positions
+
+
+def test_per_user_quota_and_admission_control():
+    scheduler = ScoringScheduler(max_concurrency=4, per_user_limit=1, max_queue=1)
+
+    with scheduler.slot("recruiter", BULK):
+        waiter = threading.Thread(target=lambda: scheduler.slot("recruiter", BULK).__enter__())
+        waiter.daemon = True
+        waiter.start()
+        time.sleep(0.05)
+
+        # The same user can't take a second slot even though capacity is free, so it stays queued
+        assert scheduler.stats()["waiting"] == 1
+        assert scheduler.is_saturated()
+        with pytest.raises(SchedulerFull):
+            with scheduler.slot("seeker", INTERACTIVE):
+                pass
+
+        # Other users still get a slot when admission is not re-checked
+        with scheduler.slot("seeker", INTERACTIVE, admit=False):
+            assert scheduler.stats()["running"] == 2
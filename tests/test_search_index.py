@@ -0,0 +1,131 @@
+import pytest
+import threading
+import numpy as np
+import search_index
+from search_index import ResumeIndex, cascade_search, benchmark_cascade
+
+
+def fake_encode(texts):
+    # Stand-in for SBERT: python, java and HR texts each point along their own axis
+    axes = ["python", "java", "hr"]
+    return np.array([[1.0 if axis in text.lower().split() else 0.0 for axis in axes] for text in texts])
+
+
+def build_sample_index():
+    index = ResumeIndex()
+    texts = ["Python developer with Django and SQL", "Java developer with Spring Boot", "HR executive handling payroll"]
+    for doc_id, (text, vector) in enumerate(zip(texts, fake_encode(texts)), start=1):
+        index.add_document(doc_id, text, name=f"{doc_id}.pdf", owner_id=7 if doc_id < 3 else 8, vector=vector)
+    return index
+
+
+def test_bm25_search_ranks_matching_resume_first():
+    index = build_sample_index()
+
+    hits = index.search("python sql developer", top_k=2)
+
+    assert hits[0][0] == 1
+    assert len(hits) == 2  # the HR resume shares no terms
+
+
+def test_search_filters_by_owner_and_replaces_documents():
+    index = build_sample_index()
+    index.add_document(1, "Accountant with payroll experience", owner_id=7)
+
+    assert [doc_id for doc_id, _ in index.search("payroll", owner_id=7)] == [1]
+    assert index.search("python") == []
+
+
+def test_cascade_and_benchmark():
+    index = build_sample_index()
+
+    top = cascade_search(index, "java spring developer", lexical_k=2, top_n=1,
+                         jd_vector=fake_encode(["java spring developer"])[0])
+    assert top[0][0] == 2
+
+    report = benchmark_cascade(index, ["java spring developer"], cutoffs=(1, 3), top_n=1, encode=fake_encode)
+    assert [row["cutoff"] for row in report] == ["full scan", 1, 3]
+    assert report[-1]["recall"] == pytest.approx(1.0)
+
+
+def test_search_is_safe_while_resumes_are_added():
+    index = build_sample_index()
+    errors = []
+
+    def writer():
+        for doc_id in range(100, 600):
+            index.add_document(doc_id, f"python developer number{doc_id} with sql", owner_id=7, vector=[1.0, 0.0, 0.0])
+
+    def reader():
+        try:
+            for _ in range(200):
+                index.search("python sql developer", top_k=5, owner_id=7)
+                index.vectors([1, 2, 3])
+        except RuntimeError as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(index) == 503
+
+
+def test_removed_resumes_free_their_vector_row():
+    index = build_sample_index()
+    index.remove_document(2)
+    index.add_document(4, "Java architect", owner_id=7, vector=[0.0, 1.0, 0.0])
+
+    assert [doc_id for doc_id, _ in index.search("developer")] == [1]
+    ids, matrix = index.vectors([1, 2, 4])
+    assert ids == [1, 4]
+    assert matrix.tolist() == [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]]
+    assert index._next_row == 3  # the removed resume's row was reused
+
+
+def test_stored_embeddings_are_reused_for_reranking(tmp_path, monkeypatch):
+    path = str(tmp_path / "index.jsonl")
+    monkeypatch.setenv("RESUME_INDEX_PATH", path)
+    monkeypatch.setattr(search_index, "_index", None)
+
+    def no_encode(texts):
+        raise AssertionError(f"re-encoded {texts}")
+
+    # Vectors computed while scoring are stored as they are; only the one without a vector is encoded
+    search_index.index_resumes([(1, "Python developer", "a.pdf", 7, np.array([1.0, 0.0, 0.0])),
+                                (2, "Java developer", "b.pdf", 7, None)], encode=fake_encode)
+    ids, scores = search_index.vector_scores(search_index.get_resume_index(), [1, 2], "python",
+                                             jd_vector=np.array([2.0, 0.0, 0.0]))
+    assert dict(zip(ids, scores)) == {1: 100.0, 2: 0.0}
+
+    # The log holds no vectors; they survive a restart through the binary file next to it
+    assert "vector" not in open(path).readline()
+    monkeypatch.setattr(search_index, "_index", None)
+    ids, matrix = search_index.get_resume_index(encode=no_encode).vectors([2, 1])
+    assert ids == [2, 1]
+    assert matrix.dtype == np.float32
+    assert matrix.tolist() == [[0.0, 1.0, 0.0], [1.0, 0.0, 0.0]]
+
+
+def test_torn_vector_record_is_dropped_and_reencoded(tmp_path, monkeypatch):
+    path = str(tmp_path / "index.jsonl")
+    monkeypatch.setattr(search_index, "_index", None)
+    search_index.index_resumes([(1, "Python developer", "a.pdf", 7, [1.0, 0.0, 0.0]),
+                                (2, "Java developer", "b.pdf", 7, [0.0, 1.0, 0.0])], path=path)
+
+    # Crash halfway through appending the second record
+    vectors = search_index.vectors_path(path)
+    with open(vectors, "r+b") as store:
+        store.truncate(store.seek(0, 2) - 5)
+
+    monkeypatch.setattr(search_index, "_index", None)
+    ids, matrix = search_index.get_resume_index(path, encode=fake_encode).vectors([1, 2])
+    assert ids == [1, 2]
+    assert matrix.tolist() == [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]]
+
+    # The re-encoded vector was appended after the cut, so the file reads back cleanly
+    stored_ids, _ = search_index._read_vectors(vectors)
+    assert stored_ids == [1, 2]
@@ -0,0 +1,119 @@
+import json
+import time
+import numpy as np
+from write_behind import WriteBehindQueue, SYNCED, SPOOLED, FAILED
+
+
+def test_jobs_are_written_in_batches(tmp_path):
+    written_batches = []
+
+    def fake_writer(jobs):
+        written_batches.append([job['payload']['resume_name'] for job in jobs])
+        return True
+
+    wb = WriteBehindQueue(writer=fake_writer, flush_interval=0.05, spool_path=str(tmp_path / "spool.jsonl"))
+    job_ids = [wb.submit("analysis", user_id=1, resume_name=f"cv_{i}.pdf") for i in range(5)]
+    wb.flush()
+
+    assert all(wb.status(job_id) == SYNCED for job_id in job_ids)
+    assert sum(len(batch) for batch in written_batches) == 5
+    assert len(written_batches) < 5
+
+
+def test_failed_writes_are_spooled_and_replayed(tmp_path):
+    spool_path = str(tmp_path / "spool.jsonl")
+    db_up = {"value": False}
+    written = []
+
+    def flaky_writer(jobs):
+        if not db_up["value"]:
+            raise ConnectionError("MySQL is down")
+        written.extend(job['payload']['resume_name'] for job in jobs)
+        return True
+
+    wb = WriteBehindQueue(writer=flaky_writer, flush_interval=0.01, max_retries=2, retry_delay=0.01,
+                          spool_path=spool_path)
+    lost_id = wb.submit("analysis", user_id=1, resume_name="offline.pdf", resume_vector=np.array([0.5, 0.25]))
+    wb.flush()
+
+    assert wb.status(lost_id) == SPOOLED
+    with open(spool_path) as spool:
+        payload = json.loads(spool.readline())['payload']
+    assert payload['resume_name'] == "offline.pdf"
+    assert payload['resume_vector'] == [0.5, 0.25]
+
+    # Once the database is back, the next successful write replays the spool
+    db_up["value"] = True
+    wb.submit("analysis", user_id=1, resume_name="online.pdf")
+    wb.flush()
+
+    assert written == ["online.pdf", "offline.pdf"]
+    assert wb.status(lost_id) == SYNCED
+
+
+def test_spool_is_retried_on_a_timer_while_idle(tmp_path):
+    spool_path = str(tmp_path / "spool.jsonl")
+    db_up = {"value": False}
+    written = []
+
+    def flaky_writer(jobs):
+        if not db_up["value"]:
+            raise ConnectionError("MySQL is down")
+        written.extend(job['payload']['resume_name'] for job in jobs)
+        return True
+
+    wb = WriteBehindQueue(writer=flaky_writer, flush_interval=0.01, max_retries=1, retry_delay=0.01,
+                          spool_path=spool_path, spool_retry_interval=0.05, max_spool_retry_interval=0.1)
+    job_id = wb.submit("analysis", user_id=1, resume_name="offline.pdf")
+    wb.flush()
+    assert wb.status(job_id) == SPOOLED
+
+    # No other write ever arrives: the timer alone brings the job back
+    db_up["value"] = True
+    deadline = time.monotonic() + 5
+    while wb.status(job_id) != SYNCED and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+    assert wb.status(job_id) == SYNCED
+    assert written == ["offline.pdf"]
+
+
+def test_worker_survives_jobs_that_cannot_be_spooled(tmp_path):
+    def down_writer(jobs):
+        raise ConnectionError("MySQL is down")
+
+    wb = WriteBehindQueue(writer=down_writer, flush_interval=0.01, max_retries=1, retry_delay=0.01,
+                          spool_path=str(tmp_path / "spool.jsonl"))
+    bad_id = wb.submit("analysis", user_id=1, resume_name=object())  # not JSON serializable
+    wb.flush()
+    assert wb.status(bad_id) == FAILED
+
+    # The worker is still alive and keeps handling later jobs
+    good_id = wb.submit("analysis", user_id=1, resume_name="later.pdf")
+    wb.flush()
+    assert wb.status(good_id) == SPOOLED
+
+
+def test_corrupt_spool_lines_are_parked_and_stranded_replays_are_merged(tmp_path):
+    spool_path = tmp_path / "spool.jsonl"
+    written = []
+
+    def job_line(name):
+        return json.dumps({"id": name, "kind": "analysis", "payload": {"resume_name": name}}) + "\n"
+
+    # A replay that was cut short, and a spool whose last write was torn by a crash
+    (tmp_path / "spool.jsonl.replay").write_text(job_line("stranded.pdf"))
+    spool_path.write_text(job_line("first.pdf") + job_line("torn.pdf")[:20])
+
+    def writer(jobs):
+        written.extend(job['payload']['resume_name'] for job in jobs)
+        return True
+
+    wb = WriteBehindQueue(writer=writer, flush_interval=0.01, spool_path=str(spool_path))
+    wb._spool([{"id": "late.pdf", "kind": "analysis", "payload": {"resume_name": "late.pdf"}}])
+    wb.submit("analysis", user_id=1, resume_name="online.pdf")
+    wb.flush()
+
+    assert sorted(written) == ["first.pdf", "late.pdf", "online.pdf", "stranded.pdf"]
+    assert (tmp_path / "spool.jsonl.failed").read_text() == job_line("torn.pdf")[:20] + "\n"
+    assert not (tmp_path / "spool.jsonl.replay").exists()
@@ -0,0 +1,14 @@
+import hashlib
+
+
+def normalize_text(text):
+    """
+    Canonical form used for content hashing: lowercase with all runs of whitespace collapsed.
+    (The SBERT model is uncased too, so texts that normalize the same also embed the same.)
+    """
+    return " ".join(text.lower().split())
+
+
+def content_hash(text):
+    """SHA-256 of the normalized text, used to deduplicate job descriptions."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
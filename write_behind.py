@@ -0,0 +1,269 @@
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from database_helper import save_write_batch
+
+# Jobs that still can't be written after all retries are appended here (one JSON job per line)
+# and replayed automatically once the database accepts writes again, or on a backing-off timer
+# while the node is idle. Jobs that keep failing after MAX_REPLAYS replays that followed a
+# successful write are parked in SPOOL_PATH + ".failed" for manual inspection.
+# Set RESUME_SPOOL_PATH to keep the spool somewhere else.
+SPOOL_PATH = "write_spool.jsonl"
+MAX_REPLAYS = 5
+
+# Sync states reported back to the UI
+PENDING = "pending"
+RETRYING = "retrying"
+SYNCED = "synced"
+SPOOLED = "spooled"
+FAILED = "failed"
+
+
+def _to_json(value):
+    # Resume embeddings ride along in the payloads as numpy arrays; they are spooled as plain lists
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _ends_on_line_break(path):
+    """False if the file ends in a partial line (e.g. a write cut short by a crash); True if it is missing or empty."""
+    try:
+        with open(path, "rb") as spool:
+            spool.seek(-1, os.SEEK_END)
+            return spool.read(1) == b"\n"
+    except OSError:
+        return True
+
+
+class WriteBehindQueue:
+    """
+    Asynchronous write-behind buffer for analysis and shortlist writes.
+    submit() returns immediately; a background worker drains the bounded queue,
+    commits jobs in batches, retries with backoff and spools to disk on failure.
+    """
+
+    def __init__(self, writer=save_write_batch, max_pending=1000, batch_size=50, flush_interval=0.2,
+                 max_retries=3, retry_delay=0.5, spool_path=SPOOL_PATH, spool_retry_interval=30,
+                 max_spool_retry_interval=600):
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.spool_path = spool_path
+        self.spool_retry_interval = spool_retry_interval
+        self.max_spool_retry_interval = max_spool_retry_interval
+
+        # The spool is retried right away on startup, then on the timer
+        self._spool_retry_wait = spool_retry_interval
+        self._next_spool_retry = time.monotonic()
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._status = OrderedDict()
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, kind, **payload):
+        """Queues one write ("analysis" or "shortlist") and returns a job id for status()."""
+        job = {"id": uuid.uuid4().hex, "kind": kind, "payload": payload}
+        self._set_status(job["id"], PENDING)
+
+        try:
+            self._queue.put(job, timeout=1)
+        except queue.Full:
+            # Buffer is full: go straight to the durable spool rather than block the UI
+            self._spool_each([job])
+        return job["id"]
+
+    def status(self, job_id):
+        with self._lock:
+            return self._status.get(job_id)
+
+    def flush(self):
+        """Blocks until every queued job has been written or spooled."""
+        self._queue.join()
+
+    def _set_status(self, job_id, status):
+        with self._lock:
+            self._status[job_id] = status
+            self._status.move_to_end(job_id)
+            # Only the recent jobs matter to the UI
+            while len(self._status) > 10000:
+                self._status.popitem(last=False)
+
+    def _spool(self, jobs, path=None, status=SPOOLED):
+        path = path or self.spool_path
+        with self._lock:
+            separator = "" if _ends_on_line_break(path) else "\n"
+            with open(path, "a", encoding="utf-8") as spool:
+                # After a torn write the partial line stays on its own, instead of swallowing the next job
+                spool.write(separator)
+                for job in jobs:
+                    spool.write(json.dumps(job, default=_to_json) + "\n")
+                spool.flush()
+                os.fsync(spool.fileno())
+        for job in jobs:
+            self._set_status(job["id"], status)
+
+    def _spool_each(self, jobs):
+        """Spools jobs one by one, so a job that can't be serialized or written is the only one lost."""
+        for job in jobs:
+            try:
+                self._spool([job])
+            except Exception as e:
+                print(f"Write-Behind Spool Error: {e}")
+                self._set_status(job["id"], FAILED)
+
+    def _replay_spool(self, counted=True):
+        """
+        Moves spooled jobs back onto the queue (whatever doesn't fit stays spooled) and returns how many were read.
+        Only counted replays (after a successful write, when the database is known to be up) count towards MAX_REPLAYS.
+        """
+        replay_path = self.spool_path + ".replay"
+        with self._lock:
+            if os.path.exists(replay_path):
+                # An earlier replay was cut short: merge its jobs back into the spool rather than overwrite them
+                separator = b"" if _ends_on_line_break(self.spool_path) else b"\n"
+                with open(replay_path, "rb") as stranded, open(self.spool_path, "ab") as spool:
+                    spool.write(separator)
+                    shutil.copyfileobj(stranded, spool)
+                os.remove(replay_path)
+            if not os.path.exists(self.spool_path):
+                return 0
+            os.replace(self.spool_path, replay_path)
+
+        # Parsed line by line: a truncated or corrupt line is parked in .failed, the jobs around it still replay
+        jobs, bad_lines = [], []
+        with open(replay_path, encoding="utf-8", errors="replace") as spool:
+            for line in spool:
+                if not line.strip():
+                    continue
+                try:
+                    job = json.loads(line)
+                except ValueError:
+                    job = None
+                if isinstance(job, dict) and "id" in job:
+                    jobs.append(job)
+                else:
+                    bad_lines.append(line.rstrip("\n") + "\n")
+        if bad_lines:
+            print(f"Write-Behind Spool Error: {len(bad_lines)} unreadable line(s) moved to {self.spool_path}.failed")
+            with self._lock:
+                with open(self.spool_path + ".failed", "a", encoding="utf-8") as failed:
+                    failed.writelines(bad_lines)
+        os.remove(replay_path)
+
+        leftover = []
+        for job in jobs:
+            if counted:
+                job["replays"] = job.get("replays", 0) + 1
+            if job.get("replays", 0) > MAX_REPLAYS:
+                self._spool([job], path=self.spool_path + ".failed", status=FAILED)
+                continue
+            try:
+                self._queue.put_nowait(job)
+                self._set_status(job["id"], PENDING)
+            except queue.Full:
+                leftover.append(job)
+        if leftover:
+            self._spool(leftover)
+        return len(jobs)
+
+    def _retry_spool(self):
+        """Timer-driven replay, so spooled jobs don't wait for some other write to succeed."""
+        try:
+            replayed = self._replay_spool(counted=False)
+        except Exception as e:
+            print(f"Write-Behind Replay Error: {e}")
+            replayed = 1
+
+        # Back off while there is something to retry; a successful write resets the wait
+        if replayed:
+            self._spool_retry_wait = min(self._spool_retry_wait * 2, self.max_spool_retry_interval)
+        else:
+            self._spool_retry_wait = self.spool_retry_interval
+        self._next_spool_retry = time.monotonic() + self._spool_retry_wait
+
+    def _try_write(self, jobs):
+        try:
+            return bool(self.writer(jobs))
+        except Exception as e:
+            print(f"Write-Behind Error: {e}")
+            return False
+
+    def _write(self, batch):
+        for attempt in range(self.max_retries):
+            if self._try_write(batch):
+                for job in batch:
+                    self._set_status(job["id"], SYNCED)
+                self._spool_retry_wait = self.spool_retry_interval
+                # The database is reachable again, so pick up anything spooled earlier
+                self._replay_spool()
+                return
+
+            for job in batch:
+                self._set_status(job["id"], RETRYING)
+            time.sleep(self.retry_delay * (2 ** attempt))
+
+        # Still failing: write jobs one by one so a single bad job doesn't sink the rest
+        for job in batch:
+            if self._try_write([job]):
+                self._set_status(job["id"], SYNCED)
+            else:
+                self._spool_each([job])
+
+    def _collect_batch(self):
+        """Waits for the next batch; returns an empty one when the spool retry timer is due first."""
+        try:
+            batch = [self._queue.get(timeout=max(0.0, self._next_spool_retry - time.monotonic()))]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            if time.monotonic() >= self._next_spool_retry:
+                self._retry_spool()
+
+            batch = self._collect_batch()
+            if not batch:
+                continue
+            try:
+                self._write(batch)
+            except Exception as e:
+                # Never let one bad batch kill the only worker: log it and keep what wasn't written
+                print(f"Write-Behind Error: {e}")
+                self._spool_each([job for job in batch if self.status(job["id"]) != SYNCED])
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+_write_queue = None
+_write_queue_lock = threading.Lock()
+
+
+def get_write_queue():
+    """Returns the process-wide write-behind queue, starting its worker on first use."""
+    global _write_queue
+    with _write_queue_lock:
+        if _write_queue is None:
+            _write_queue = WriteBehindQueue(spool_path=os.environ.get("RESUME_SPOOL_PATH", SPOOL_PATH))
+        return _write_queue